@@ -2,6 +2,7 @@ import os
 
 from celery import Celery
 from django.conf import settings
+from django.core.cache import cache
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.local")
 
@@ -9,3 +10,13 @@ app = Celery("form_wizard")
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
+
+
+def schedule_once(key: str, task, countdown: int, args: tuple = ()) -> None:
+    """
+    Run ``task`` ``countdown`` seconds from now, unless a run scheduled under
+    ``key`` is still pending. The task deletes ``key`` when it runs.
+    """
+    # the key outlives the countdown so a lost task only delays the next run
+    if cache.add(key, 1, timeout=countdown * 10 + 60):
+        task.apply_async(args, countdown=countdown)
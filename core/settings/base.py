@@ -39,6 +39,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "responses.middleware.RespondentTokenMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -71,6 +72,55 @@ CHANNEL_LAYERS = {
         },
     },
 }
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://127.0.0.1:6379/1",
+    },
+}
+
+# Optional directory for on-disk copies of published pipeline documents
+PIPELINE_DOCUMENTS_DIR = env("PIPELINE_DOCUMENTS_DIR", default=None)
+# Number of form validation plans each process keeps in memory
+VALIDATION_PLAN_LOCAL_CACHE_SIZE = 1000
+
+# Maximum number of per-form report queries running at once for a websocket report
+REPORT_QUERY_CONCURRENCY = 4
+
+# Websocket reports of a pipeline are rebuilt at most once per this many seconds
+REPORT_BROADCAST_WINDOW = 2
+# Seconds a websocket report listener count lives without a heartbeat
+REPORT_LISTENERS_TTL = 60
+# Number of report deltas kept so that reconnecting websockets can catch up
+REPORT_DELTA_HISTORY = 50
+# Seconds a report snapshot built for connecting websockets is reused
+REPORT_SNAPSHOT_TTL = 5
+
+# Queue submissions and answer 202 with a receipt instead of writing them in the request
+RESPONSE_INGESTION_QUEUE = env.bool("RESPONSE_INGESTION_QUEUE", default=False)
+# Queued submissions are written at most this many seconds after they arrive
+RESPONSE_INGESTION_WINDOW = 1
+# Seconds the response of a request with an Idempotency-Key is replayed to retries
+IDEMPOTENCY_TTL = 60 * 60 * 24
+# Seconds a retry waits for the first request with the same Idempotency-Key
+IDEMPOTENCY_LOCK_TIMEOUT = 10
+
+# How anonymous respondents are identified: "session" (database sessions) or
+# "token" (signed tokens in a cookie or the X-Respondent-Token header, no writes)
+RESPONDENT_IDENTITY = env("RESPONDENT_IDENTITY", default="session")
+# Cookie that carries the respondent token
+RESPONDENT_TOKEN_COOKIE = "respondent"
+# Seconds a respondent token is valid
+RESPONDENT_TOKEN_MAX_AGE = 60 * 60 * 24 * 14
+# Seconds a grant from unlocking a private pipeline is accepted instead of its password
+PIPELINE_ACCESS_GRANT_MAX_AGE = 60 * 60
+
+# Number of submissions read per round trip of the cursor of a response export
+EXPORT_CHUNK_SIZE = 2000
+# Number of submissions per row group of a Parquet response export
+EXPORT_ROW_GROUP_SIZE = 50000
+# Local directory where Parquet response exports are stored for download
+RESPONSE_EXPORTS_DIR = env("RESPONSE_EXPORTS_DIR", default=str(BASE_DIR / "exports"))
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -112,6 +162,7 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 20,
+    "DEFAULT_THROTTLE_RATES": {"pipeline-unlock": "10/minute"},
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 SPECTACULAR_SETTINGS = {
@@ -137,4 +188,12 @@ CELERY_BEAT_SCHEDULE = {
         "task": "reports.tasks.send_reports_to_subscriber",
         "schedule": crontab(day_of_month="1", hour="0", minute="0"),
     },
+    "flush_pipeline_views": {
+        "task": "forms.tasks.flush_pipeline_views_task",
+        "schedule": 60.0,
+    },
+    "drain_response_ingestions": {
+        "task": "responses.tasks.drain_response_ingestions",
+        "schedule": 60.0,
+    },
 }
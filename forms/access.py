@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+ACCESS_GRANT_HEADER = "X-Pipeline-Grant"
+
+
+def get_grant_signer() -> signing.TimestampSigner:
+    return signing.TimestampSigner(salt="forms.pipeline-access")
+
+
+def get_password_fingerprint(password_hash: str) -> str:
+    # changing the password revokes the grants issued for the old one
+    return salted_hmac("forms.pipeline-password", password_hash or "").hexdigest()[:16]
+
+
+def issue_access_grant(pipeline_id: int, password_hash: str) -> str:
+    return get_grant_signer().sign_object(
+        {"pipeline": pipeline_id, "password": get_password_fingerprint(password_hash)}
+    )
+
+
+def has_access_grant(request, pipeline_id: int, password_hash: str) -> bool:
+    """
+    Check the grant of the ``X-Pipeline-Grant`` header for a private pipeline.
+    Unlike the password, this takes an HMAC and no password hashing.
+    """
+    grant = request.headers.get(ACCESS_GRANT_HEADER)
+    if not grant:
+        return False
+    try:
+        payload = get_grant_signer().unsign_object(
+            grant, max_age=settings.PIPELINE_ACCESS_GRANT_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return payload.get("pipeline") == pipeline_id and constant_time_compare(
+        payload.get("password", ""), get_password_fingerprint(password_hash)
+    )
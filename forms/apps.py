@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class FormsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'forms'
+
+    def ready(self) -> None:
+        from forms import signals
+
+        return super().ready()
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from .models import Pipeline
+
+
+LISTED_SLOT_KEY = "pipeline_views_listed"
+FLUSHED_SLOT_KEY = "pipeline_views_flushed"
+STALLED_SLOT_KEY = "pipeline_views_stalled"
+# a pipeline lost from the list by a crashed worker is listed again after this
+DIRTY_TIMEOUT = 60 * 60
+
+
+def get_views_key(pipeline_id: int) -> str:
+    return f"pipeline_views_{pipeline_id}"
+
+
+def get_dirty_key(pipeline_id: int) -> str:
+    return f"pipeline_views_dirty_{pipeline_id}"
+
+
+def get_slot_key(slot: int) -> str:
+    return f"pipeline_views_slot_{slot}"
+
+
+def increment_pipeline_views(pipeline_id: int) -> int:
+    """
+    Count a view in the cache and return the number of views not flushed yet.
+    The first view since the last flush lists the pipeline for the next one.
+    """
+    key = get_views_key(pipeline_id)
+    cache.add(key, 0, timeout=None)
+    pending = cache.incr(key)
+    if cache.add(get_dirty_key(pipeline_id), 1, timeout=DIRTY_TIMEOUT):
+        cache.add(LISTED_SLOT_KEY, 0, timeout=None)
+        slot = cache.incr(LISTED_SLOT_KEY)
+        cache.set(get_slot_key(slot), pipeline_id, timeout=None)
+    return pending
+
+
+def get_pending_views(pipeline_id: int) -> int:
+    return cache.get(get_views_key(pipeline_id), 0)
+
+
+def get_number_of_views(pipeline: Pipeline) -> int:
+    return pipeline.number_of_views + get_pending_views(pipeline.id)
+
+
+def flush_pipeline_views(batch_size: int = 1000) -> int:
+    """
+    Move the buffered view counts of the pipelines listed since the last run
+    into ``Pipeline.number_of_views``, so a run costs nothing without views.
+
+    Each batch of pipelines is written with a single UPDATE and the flushed
+    amounts are then subtracted from the counters, so views counted while
+    flushing are kept for the next run.
+    """
+    flushed = 0
+    position = cache.get(FLUSHED_SLOT_KEY, 0)
+    end = cache.get(LISTED_SLOT_KEY, 0)
+    stalled = cache.get(STALLED_SLOT_KEY)
+    while position < end:
+        slots = range(position + 1, min(position + batch_size, end) + 1)
+        listed = cache.get_many([get_slot_key(slot) for slot in slots])
+        pipeline_ids = []
+        for slot in slots:
+            pipeline_id = listed.get(get_slot_key(slot))
+            if pipeline_id is None and slot != stalled:
+                # taken by a view that has not filled it yet; still empty on
+                # the next run, it is skipped
+                cache.set(STALLED_SLOT_KEY, slot, timeout=None)
+                end = position
+                break
+            if pipeline_id is not None:
+                pipeline_ids.append(pipeline_id)
+            position = slot
+
+        # views counted from now on list their pipeline again
+        cache.delete_many(
+            [get_dirty_key(id) for id in pipeline_ids]
+            + [get_slot_key(slot) for slot in range(slots.start, position + 1)]
+        )
+        cache.set(FLUSHED_SLOT_KEY, position, timeout=None)
+        flushed += _flush_batch(pipeline_ids)
+    return flushed
+
+
+def _flush_batch(pipeline_ids: list[int]) -> int:
+    pending = cache.get_many([get_views_key(id) for id in pipeline_ids])
+    deltas = {
+        id: pending[get_views_key(id)]
+        for id in pipeline_ids
+        if pending.get(get_views_key(id))
+    }
+    if not deltas:
+        return 0
+
+    with transaction.atomic():
+        Pipeline.objects.filter(id__in=deltas).update(
+            number_of_views=F("number_of_views")
+            + Case(
+                *[When(id=id, then=Value(delta)) for id, delta in deltas.items()],
+                default=Value(0),
+            )
+        )
+    for id, delta in deltas.items():
+        cache.decr(get_views_key(id), delta)
+    return sum(deltas.values())
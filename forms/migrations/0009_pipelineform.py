@@ -0,0 +1,39 @@
+# Generated by Django 5.0.7 on 2026-10-18 11:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0008_remove_category_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PipelineForm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pipeline_links', to='forms.form')),
+                ('pipeline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='form_links', to='forms.pipeline')),
+            ],
+            options={
+                'ordering': ['pipeline', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='pipeline',
+            name='forms',
+            field=models.ManyToManyField(blank=True, related_name='pipelines', through='forms.PipelineForm', to='forms.form'),
+        ),
+        migrations.AddConstraint(
+            model_name='pipelineform',
+            constraint=models.UniqueConstraint(fields=('pipeline', 'position'), name='pipeline_form_position_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='pipelineform',
+            constraint=models.UniqueConstraint(fields=('pipeline', 'form'), name='pipeline_form_uniq'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def backfill_pipeline_forms(apps, schema_editor):
+    Form = apps.get_model("forms", "Form")
+    Pipeline = apps.get_model("forms", "Pipeline")
+    PipelineForm = apps.get_model("forms", "PipelineForm")
+
+    form_ids = set(Form.objects.values_list("id", flat=True))
+    links = []
+    for pipeline in Pipeline.objects.only("id", "metadata").iterator():
+        seen = set()
+        for form_id in pipeline.metadata.get("order", []):
+            if form_id in seen or form_id not in form_ids:
+                continue
+            seen.add(form_id)
+            links.append(
+                PipelineForm(
+                    pipeline_id=pipeline.id, form_id=form_id, position=len(seen) - 1
+                )
+            )
+    PipelineForm.objects.bulk_create(links, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forms", "0009_pipelineform"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_pipeline_forms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.db import migrations, models
+
+
+def hash_pipeline_passwords(apps, schema_editor):
+    Pipeline = apps.get_model("forms", "Pipeline")
+
+    pipelines = []
+    for pipeline in Pipeline.objects.exclude(password__isnull=True).exclude(
+        password=""
+    ):
+        try:
+            identify_hasher(pipeline.password)
+        except ValueError:
+            pipeline.password = make_password(pipeline.password)
+            pipelines.append(pipeline)
+    Pipeline.objects.bulk_update(pipelines, ["password"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("forms", "0010_backfill_pipelineform"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="pipeline",
+            name="password",
+            field=models.CharField(blank=True, max_length=128, null=True),
+        ),
+        migrations.RunPython(hash_pipeline_passwords, migrations.RunPython.noop),
+    ]
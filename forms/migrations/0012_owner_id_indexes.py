@@ -0,0 +1,31 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0011_hash_pipeline_passwords'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['owner', 'id'], name='category_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='field',
+            index=models.Index(fields=['owner', 'id'], name='field_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='form',
+            index=models.Index(fields=['owner', 'id'], name='form_owner_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pipeline',
+            index=models.Index(fields=['owner', 'id'], name='pipeline_owner_id_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0012_owner_id_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipeline',
+            name='document_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+    ]
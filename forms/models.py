@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
 from django.db import models
 from django.urls import reverse
 
@@ -31,6 +32,9 @@ class Field(models.Model):
             "numeric input",
         )
 
+    class Meta:
+        indexes = [models.Index(fields=["owner", "id"], name="field_owner_id_idx")]
+
     metadata = models.JSONField()
     title = models.CharField(max_length=250)
     slug = models.SlugField()
@@ -46,6 +50,9 @@ class Field(models.Model):
 
 
 class Form(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=["owner", "id"], name="form_owner_id_idx")]
+
     metadata = models.JSONField()
     title = models.CharField(max_length=250)
     fields = models.ManyToManyField(Field, related_name="forms", blank=True)
@@ -58,6 +65,9 @@ class Form(models.Model):
 
 
 class Pipeline(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=["owner", "id"], name="pipeline_owner_id_idx")]
+
     metadata = models.JSONField()
     title = models.CharField(max_length=250)
     slug = models.SlugField(max_length=20)
@@ -70,25 +80,63 @@ class Pipeline(models.Model):
     hide_previous_button = models.BooleanField()
     hide_next_button = models.BooleanField()
     is_private = models.BooleanField()
-    password = models.CharField(max_length=50, null=True, blank=True)
+    password = models.CharField(max_length=128, null=True, blank=True)
     owner = models.ForeignKey(
         to=get_user_model(),
         on_delete=models.SET_NULL,
         null=True,
     )
     number_of_views = models.PositiveBigIntegerField(default=0)
+    # version of the last published document, see forms.publishing
+    document_version = models.CharField(max_length=32, blank=True, default="")
     categories = models.ManyToManyField(
         to="Category", related_name="pipelines", blank=True
     )
+    forms = models.ManyToManyField(
+        to=Form, through="PipelineForm", related_name="pipelines", blank=True
+    )
 
     def get_absolute_url(self):
         return reverse("api:forms:pipeline-show", kwargs={"pipeline_slug": self.slug})
 
+    def check_password(self, raw_password: str) -> bool:
+        return self.password is not None and check_password(
+            raw_password, self.password
+        )
+
     def __str__(self):
         return f"{self.title} - {self.owner.email}"
 
 
+class PipelineForm(models.Model):
+    """
+    Normalized copy of ``Pipeline.metadata["order"]``, kept in sync on save.
+    """
+
+    class Meta:
+        ordering = ["pipeline", "position"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["pipeline", "position"], name="pipeline_form_position_uniq"
+            ),
+            models.UniqueConstraint(
+                fields=["pipeline", "form"], name="pipeline_form_uniq"
+            ),
+        ]
+
+    pipeline = models.ForeignKey(
+        to=Pipeline, on_delete=models.CASCADE, related_name="form_links"
+    )
+    form = models.ForeignKey(
+        to=Form, on_delete=models.CASCADE, related_name="pipeline_links"
+    )
+    position = models.PositiveIntegerField()
+
+
 class Category(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=["owner", "id"], name="category_owner_id_idx")]
+
     name = models.CharField(max_length=250)
     owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
 
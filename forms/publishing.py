@@ -0,0 +1,122 @@
+import json
+import os
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+
+from responses.models import PipelineSubmission
+from responses.respondents import get_session_key
+
+from .models import Pipeline, PipelineForm
+from .serializers import PipelineShowSerializer
+
+
+def get_document_key(slug: str) -> str:
+    return f"pipeline_document_{slug}"
+
+
+def get_document_path(slug: str) -> Path | None:
+    if not settings.PIPELINE_DOCUMENTS_DIR:
+        return None
+    return Path(settings.PIPELINE_DOCUMENTS_DIR) / f"{slug}.json"
+
+
+def build_pipeline_document(pipeline: Pipeline) -> dict:
+    return json.loads(json.dumps(PipelineShowSerializer(instance=pipeline).data))
+
+
+def publish_pipeline(pipeline_id: int) -> dict | None:
+    """
+    Compile the public document of a pipeline and store it in the cache and,
+    when ``PIPELINE_DOCUMENTS_DIR`` is set, on disk.
+
+    Every document gets a new random version, which is also saved on the
+    pipeline row, so a copy that missed a later publish can be told apart.
+    """
+    pipeline = (
+        Pipeline.objects.select_related("owner")
+        .prefetch_related("categories")
+        .filter(pk=pipeline_id)
+        .first()
+    )
+    if pipeline is None:
+        return None
+    document = build_pipeline_document(pipeline)
+    document["version"] = uuid.uuid4().hex
+    Pipeline.objects.filter(pk=pipeline.id).update(
+        document_version=document["version"]
+    )
+    cache.set(get_document_key(pipeline.slug), document, timeout=None)
+
+    path = get_document_path(pipeline.slug)
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(document))
+        os.replace(tmp_path, path)
+    return document
+
+
+def publish_pipelines_of_forms(form_ids) -> None:
+    pipeline_ids = (
+        PipelineForm.objects.filter(form_id__in=form_ids)
+        .values_list("pipeline_id", flat=True)
+        .distinct()
+    )
+    for pipeline_id in pipeline_ids:
+        publish_pipeline(pipeline_id)
+
+
+def unpublish_pipeline(slug: str) -> None:
+    cache.delete(get_document_key(slug))
+    path = get_document_path(slug)
+    if path is not None:
+        path.unlink(missing_ok=True)
+
+
+def get_pipeline_document(slug: str) -> dict | None:
+    document = cache.get(get_document_key(slug))
+    if document is not None:
+        return document
+
+    path = get_document_path(slug)
+    if path is not None and path.exists():
+        document = json.loads(path.read_text())
+        cache.set(get_document_key(slug), document, timeout=None)
+        return document
+
+    pipeline_id = (
+        Pipeline.objects.filter(slug=slug).values_list("id", flat=True).first()
+    )
+    if pipeline_id is None:
+        return None
+    return publish_pipeline(pipeline_id)
+
+
+def get_respondent_forms(document: dict, request) -> dict:
+    """
+    Return the forms of the document that the respondent may see now.
+    """
+    if not document["hide_next_button"]:
+        return document["forms"]
+
+    order = document["metadata"]["order"]
+    if request.user.is_authenticated:
+        submission = PipelineSubmission.objects.filter(
+            pipeline__id=document["id"], owner__id=request.user.id
+        )
+    else:
+        submission = PipelineSubmission.objects.filter(
+            pipeline__id=document["id"], session_key=get_session_key(request)
+        )
+    next_position = submission.values_list("next_position", flat=True).first() or 0
+    # the answered forms and the next one
+    form_ids = order[: next_position + 1]
+
+    return {
+        str(id): document["forms"][str(id)]
+        for id in form_ids
+        if str(id) in document["forms"]
+    }
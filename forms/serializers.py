@@ -1,10 +1,13 @@
-from django.db.models.fields.json import KT
+from django.contrib.auth.hashers import make_password
+from django.db.models import Prefetch
 from rest_framework import serializers
 
-from forms.models import Category, Field, Form, Pipeline
-from responses.models import PipelineSubmission, Response
+from forms.models import Category, Field, Form, Pipeline, PipelineForm
+from responses.models import Response
 
-from .utils import get_random_string
+from .counters import get_number_of_views
+from .projection import ProjectedSerializerMixin
+from .utils import get_ordered_fields, get_pipeline_forms, get_random_string
 
 
 class FieldSerializer(serializers.ModelSerializer):
@@ -429,7 +432,10 @@ class UpdateFieldSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class FormSerializer(serializers.ModelSerializer):
+class FormSerializer(ProjectedSerializerMixin, serializers.ModelSerializer):
+    # the expanded fields are put in metadata order
+    projection_columns = {"fields": ["metadata"]}
+
     class Meta:
         model = Form
         fields = "__all__"
@@ -437,6 +443,21 @@ class FormSerializer(serializers.ModelSerializer):
             "owner",
         ]
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if "fields" in self.expand:
+            fields["fields"] = serializers.SerializerMethodField(
+                method_name="get_expanded_fields"
+            )
+        return fields
+
+    def get_expanded_fields(self, obj: Form):
+        return FieldSerializer(instance=get_ordered_fields(obj), many=True).data
+
+    @classmethod
+    def get_prefetches(cls, expand: set[str]) -> list:
+        return ["fields"] if "fields" in expand else []
+
     def validate(self, attrs):
         if "order" not in attrs["metadata"] or not isinstance(
             attrs["metadata"]["order"], list
@@ -503,11 +524,7 @@ class UpdateFormSerializer(serializers.ModelSerializer):
                 if set(validated_data["metadata"]["order"]) != set(
                     instance.metadata["order"]
                 ):
-                    if (
-                        Pipeline.objects.annotate(order=KT("metadata__order"))
-                        .filter(order__contains=instance.id)
-                        .exists()
-                    ):
+                    if instance.pipeline_links.exists():
                         raise serializers.ValidationError(
                             {
                                 "metadata": {
@@ -542,21 +559,60 @@ class UpdateFormSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
-class PipelineSerializer(serializers.ModelSerializer):
+class PipelineSerializer(ProjectedSerializerMixin, serializers.ModelSerializer):
     share_link = serializers.SerializerMethodField()
+    projection_columns = {"share_link": ["slug"]}
 
     class Meta:
         model = Pipeline
-        fields = "__all__"
+        # the ordered forms are rendered only with ?expand=forms
+        exclude = ["forms", "document_version"]
         read_only_fields = [
             "owner",
             "slug",
             "share_link",
         ]
+        extra_kwargs = {"password": {"write_only": True}}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if "forms" in self.expand:
+            fields["forms"] = serializers.SerializerMethodField(
+                method_name="get_expanded_forms"
+            )
+        return fields
 
     def get_share_link(self, obj: Pipeline):
         return obj.get_absolute_url()
 
+    def get_expanded_forms(self, obj: Pipeline):
+        # prefetched in order by get_prefetches
+        return FormSerializer(
+            instance=[link.form for link in obj.ordered_form_links],
+            many=True,
+            expand={"fields"} if "forms.fields" in self.expand else set(),
+        ).data
+
+    @classmethod
+    def get_prefetches(cls, expand: set[str]) -> list:
+        if "forms" not in expand:
+            return []
+        return [
+            Prefetch(
+                "form_links",
+                queryset=PipelineForm.objects.select_related("form")
+                .prefetch_related("form__fields", "form__categories")
+                .order_by("position"),
+                to_attr="ordered_form_links",
+            )
+        ]
+
+    def to_representation(self, instance: Pipeline):
+        rep = super().to_representation(instance)
+        if "number_of_views" in self.fields:
+            rep["number_of_views"] = get_number_of_views(instance)
+        return rep
+
     def validate(self, attrs):
         if "is_private" in attrs and attrs["is_private"] is True:
             if "password" not in attrs:
@@ -565,6 +621,9 @@ class PipelineSerializer(serializers.ModelSerializer):
                 )
         return super().validate(attrs)
 
+    def validate_password(self, password):
+        return make_password(password) if password else password
+
     def validate_metadata(self, metadata):
         if "order" not in metadata or not isinstance(metadata["order"], list):
             raise serializers.ValidationError(
@@ -574,6 +633,10 @@ class PipelineSerializer(serializers.ModelSerializer):
                     }
                 }
             )
+        if len(set(metadata["order"])) != len(metadata["order"]):
+            raise serializers.ValidationError(
+                {"metadata": {"order": "A form can't be repeated in the order."}}
+            )
         for id in metadata["order"]:
             if not Form.objects.filter(
                 id=id, owner__id=self.context["request"].user.id
@@ -616,6 +679,10 @@ class PipelineSerializer(serializers.ModelSerializer):
                 }
             )
 
+        if len(set(metadata["order"])) != len(metadata["order"]):
+            raise serializers.ValidationError(
+                {"metadata": {"order": "A form can't be repeated in the order."}}
+            )
         for id in metadata["order"]:
             if not Form.objects.filter(
                 id=id, owner__id=self.context["request"].user.id
@@ -633,67 +700,33 @@ class PipelineSerializer(serializers.ModelSerializer):
 
 
 class PipelineShowSerializer(serializers.ModelSerializer):
+    """
+    Builds the published document of a pipeline with all of its forms.
+
+    The per-respondent slice of forms and the view counter are applied by
+    ``PipelineShareView`` on top of the cached document.
+    """
+
     owner = serializers.SerializerMethodField()
+    categories = serializers.SerializerMethodField()
     forms = serializers.SerializerMethodField()
 
     class Meta:
         model = Pipeline
-        exclude = ("password",)
-        read_only_fields = (
-            "id",
-            "title",
-            "slug",
-            "description_text",
-            "metadata",
-            "questions_responding_duration",
-            "start_datetime",
-            "stop_datetime",
-            "hide_previous_button",
-            "hide_next_button",
-            "is_private",
-            "owner",
-            "number_of_views",
-            "categories",
-        )
-        depth = 2
+        exclude = ("password", "number_of_views", "document_version")
 
     def get_owner(self, obj: Pipeline):
         return obj.owner.email
 
+    def get_categories(self, obj: Pipeline):
+        return [
+            {"id": category.id, "name": category.name}
+            for category in obj.categories.all()
+        ]
+
     def get_forms(self, obj: Pipeline):
-        form_ids = None
         OUTPUT = {}
-        if obj.hide_next_button:
-            if self.context["request"].user.is_authenticated:
-                submission = PipelineSubmission.objects.filter(
-                    pipeline__id=obj.id, owner__id=self.context["request"].user.id
-                )
-                if submission.exists():
-                    form_ids = submission[0].responses["responsed_forms"]
-                    last_index = obj.metadata["order"].index(form_ids[-1])
-                    if len(obj.metadata["order"]) > last_index + 1:
-                        form_ids.append(obj.metadata["order"][last_index + 1])
-                else:
-                    form_ids = obj.metadata["order"][:1]
-            else:
-                if self.context["request"].session.session_key is None:
-                    self.context["request"].session.create()
-                session_key = self.context["request"].session.session_key
-                submission = PipelineSubmission.objects.filter(
-                    pipeline__id=obj.id, session_key=session_key
-                )
-                if submission.exists():
-                    form_ids = submission[0].responses["responsed_forms"]
-                    last_index = obj.metadata["order"].index(form_ids[-1])
-                    if len(obj.metadata["order"]) > last_index + 1:
-                        form_ids.append(obj.metadata["order"][last_index + 1])
-                else:
-                    form_ids = obj.metadata["order"][:1]
-        else:
-            form_ids = obj.metadata["order"]
-
-        for form_id in form_ids:
-            form: Form = Form.objects.get(pk=form_id)
+        for form in get_pipeline_forms(obj.id):
             OUTPUT[str(form.id)] = {}
             OUTPUT[str(form.id)]["metadata"] = form.metadata
             OUTPUT[str(form.id)]["title"] = form.title
@@ -719,7 +752,7 @@ class PipelineShowSerializer(serializers.ModelSerializer):
         return OUTPUT
 
 
-class CategorySerializer(serializers.ModelField):
+class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
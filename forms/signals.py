@@ -0,0 +1,138 @@
+from django.db import transaction
+from django.db.models.signals import (
+    ModelSignal,
+    m2m_changed,
+    post_delete,
+    post_save,
+)
+from django.dispatch import receiver
+
+from .models import Category, Field, Form, Pipeline, PipelineForm
+from .publishing import (
+    publish_pipeline,
+    publish_pipelines_of_forms,
+    unpublish_pipeline,
+)
+from .utils import bump_form_version
+
+
+def invalidate_forms(form_ids) -> None:
+    # run after commit so no reader rebuilds a plan or document from
+    # uncommitted rows
+    form_ids = list(form_ids)
+
+    def invalidate():
+        for id in form_ids:
+            bump_form_version(id)
+        publish_pipelines_of_forms(form_ids)
+
+    transaction.on_commit(invalidate)
+
+
+def republish_pipelines(pipeline_ids) -> None:
+    pipeline_ids = list(pipeline_ids)
+    transaction.on_commit(lambda: [publish_pipeline(id) for id in pipeline_ids])
+
+
+@receiver(signal=post_save, sender=Field)
+def invalidate_forms_when_save_field(
+    sender: ModelSignal,
+    instance: Field,
+    **kwargs,
+):
+    invalidate_forms(instance.forms.values_list("id", flat=True))
+
+
+@receiver(signal=post_save, sender=Form)
+def invalidate_form_when_save_form(
+    sender: ModelSignal,
+    instance: Form,
+    **kwargs,
+):
+    invalidate_forms([instance.id])
+
+
+@receiver(signal=m2m_changed, sender=Form.fields.through)
+def invalidate_forms_when_change_fields(
+    sender: ModelSignal,
+    instance,
+    action: str,
+    reverse: bool,
+    pk_set: set,
+    **kwargs,
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_forms([instance.id])
+    elif action == "pre_clear":
+        invalidate_forms(instance.forms.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove"):
+        invalidate_forms(pk_set)
+
+
+@receiver(signal=post_save, sender=Pipeline)
+def sync_form_order_when_save_pipeline(
+    sender: ModelSignal,
+    instance: Pipeline,
+    update_fields=None,
+    **kwargs,
+):
+    if update_fields is not None and "metadata" not in update_fields:
+        return
+    order = instance.metadata.get("order", [])
+    if list(instance.form_links.values_list("form_id", flat=True)) == order:
+        return
+    with transaction.atomic():
+        instance.form_links.all().delete()
+        PipelineForm.objects.bulk_create(
+            [
+                PipelineForm(pipeline=instance, form_id=form_id, position=position)
+                for position, form_id in enumerate(order)
+            ]
+        )
+
+
+@receiver(signal=post_save, sender=Pipeline)
+def republish_when_save_pipeline(
+    sender: ModelSignal,
+    instance: Pipeline,
+    **kwargs,
+):
+    republish_pipelines([instance.id])
+
+
+@receiver(signal=post_delete, sender=Pipeline)
+def unpublish_when_delete_pipeline(
+    sender: ModelSignal,
+    instance: Pipeline,
+    **kwargs,
+):
+    slug = instance.slug
+    transaction.on_commit(lambda: unpublish_pipeline(slug))
+
+
+@receiver(signal=m2m_changed, sender=Pipeline.categories.through)
+def republish_when_change_categories(
+    sender: ModelSignal,
+    instance,
+    action: str,
+    reverse: bool,
+    pk_set: set,
+    **kwargs,
+):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            republish_pipelines([instance.id])
+    elif action == "pre_clear":
+        republish_pipelines(instance.pipelines.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove"):
+        republish_pipelines(pk_set)
+
+
+@receiver(signal=post_save, sender=Category)
+def republish_when_save_category(
+    sender: ModelSignal,
+    instance: Category,
+    **kwargs,
+):
+    republish_pipelines(instance.pipelines.values_list("id", flat=True))
@@ -0,0 +1,12 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+from .counters import flush_pipeline_views
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def flush_pipeline_views_task():
+    flushed = flush_pipeline_views()
+    logger.info(f"{flushed} pipeline views flushed")
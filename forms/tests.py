@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from testing import TEST_CACHES, create_pipeline, create_user
+
+from .counters import (
+    flush_pipeline_views,
+    get_pending_views,
+    increment_pipeline_views,
+)
+from . import validation
+from .models import Form, Pipeline
+from .publishing import get_document_path, publish_pipeline
+from .validation import get_validation_plan
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FormListViewTests(TestCase):
+    def setUp(self):
+        self.owner = create_user(1)
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse("api:forms:form-list")
+
+    def test_projection_with_expanded_fields_takes_constant_queries(self):
+        # the page with its count, then the forms and their fields
+        create_pipeline(self.owner, 7)
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                self.url, {"fields": "id,title", "expand": "fields"}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 7)
+        self.assertEqual(
+            [field["slug"] for field in response.data["results"][0]["fields"]],
+            ["age", "color"],
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class PipelineShareViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.pipeline = create_pipeline(create_user(1), 2)
+        self.pipeline.refresh_from_db()
+        self.url = reverse(
+            "api:forms:pipeline-show", kwargs={"pipeline_slug": self.pipeline.slug}
+        )
+
+    def test_private_row_is_checked_behind_a_stale_document(self):
+        self.assertEqual(APIClient().get(self.url).status_code, 200)
+        # made private without the document being published again
+        Pipeline.objects.filter(pk=self.pipeline.pk).update(
+            is_private=True, password=make_password("secret")
+        )
+
+        response = APIClient().get(self.url)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.data)
+
+    def test_stale_document_on_disk_is_published_again(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with self.settings(PIPELINE_DOCUMENTS_DIR=directory):
+            publish_pipeline(self.pipeline.id)
+            path = get_document_path(self.pipeline.slug)
+            stale = path.read_text()
+            Pipeline.objects.filter(pk=self.pipeline.pk).update(title="renamed")
+            publish_pipeline(self.pipeline.id)
+            # the copy of a host that missed the second publish
+            path.write_text(stale)
+            cache.clear()
+
+            response = APIClient().get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["title"], "renamed")
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FlushPipelineViewsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        owner = create_user(1)
+        self.pipelines = [create_pipeline(owner, 1) for _ in range(3)]
+
+    def test_only_viewed_pipelines_are_flushed(self):
+        viewed = self.pipelines[0]
+        increment_pipeline_views(viewed.id)
+        increment_pipeline_views(viewed.id)
+
+        self.assertEqual(flush_pipeline_views(), 2)
+        views = Pipeline.objects.order_by("id").values_list(
+            "number_of_views", flat=True
+        )
+        self.assertEqual(list(views), [2, 0, 0])
+        self.assertEqual(get_pending_views(viewed.id), 0)
+
+    def test_run_without_views_takes_no_queries(self):
+        increment_pipeline_views(self.pipelines[0].id)
+        flush_pipeline_views()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(flush_pipeline_views(), 0)
+
+    def test_pipeline_viewed_after_a_flush_is_listed_again(self):
+        pipeline = self.pipelines[1]
+        increment_pipeline_views(pipeline.id)
+        flush_pipeline_views()
+        increment_pipeline_views(pipeline.id)
+
+        self.assertEqual(flush_pipeline_views(), 1)
+        pipeline.refresh_from_db()
+        self.assertEqual(pipeline.number_of_views, 2)
+
+
+@override_settings(CACHES=TEST_CACHES, VALIDATION_PLAN_LOCAL_CACHE_SIZE=2)
+class ValidationPlanTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        validation._local_plans.clear()
+        pipeline = create_pipeline(create_user(1), 3)
+        self.forms = list(Form.objects.filter(id__in=pipeline.metadata["order"]))
+
+    def test_local_plans_keep_the_most_recently_used(self):
+        first, second, third = self.forms
+        get_validation_plan(first)
+        get_validation_plan(second)
+        get_validation_plan(first)
+        get_validation_plan(third)
+
+        self.assertEqual(list(validation._local_plans), [first.id, third.id])
@@ -40,6 +40,11 @@ pipline_urls = [
         views.PipelineShareView.as_view(),
         name="pipeline-show",
     ),
+    path(
+        "unlock/<slug:pipeline_slug>",
+        views.PipelineUnlockView.as_view(),
+        name="pipeline-unlock",
+    ),
 ]
 
 category_urls = [
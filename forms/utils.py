@@ -1,5 +1,10 @@
 import random
 import string
+import uuid
+
+from django.core.cache import cache
+
+from .models import Form, PipelineForm
 
 
 def get_random_string(length: int) -> str:
@@ -7,3 +12,47 @@ def get_random_string(length: int) -> str:
     letters = string.ascii_lowercase
     result_str = "".join(random.choice(letters) for i in range(length))
     return result_str
+
+
+def get_pipeline_forms(pipeline_id: int) -> list:
+    """
+    Return the forms of a pipeline in order, with their fields prefetched.
+    """
+    links = (
+        PipelineForm.objects.filter(pipeline_id=pipeline_id)
+        .select_related("form")
+        .prefetch_related("form__fields")
+        .order_by("position")
+    )
+    return [link.form for link in links]
+
+
+def get_ordered_fields(form: Form) -> list:
+    """
+    Return the fields of a form in ``metadata["order"]``, followed by any
+    field missing from it.
+    """
+    fields = {field.id: field for field in form.fields.all()}
+    order = [id for id in form.metadata.get("order", []) if id in fields]
+    return [fields[id] for id in order] + [
+        field for id, field in fields.items() if id not in order
+    ]
+
+
+def get_form_version(form_id: int) -> str:
+    """
+    Return the current version token of a form and its fields.
+
+    Tokens are random, so a version evicted from the cache never comes back
+    with a value that an old cached entry was built for.
+    """
+    key = f"form_version_{form_id}"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_form_version(form_id: int) -> None:
+    cache.set(f"form_version_{form_id}", uuid.uuid4().hex, timeout=None)
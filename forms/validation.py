@@ -0,0 +1,186 @@
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import serializers
+
+from .models import Field, Form
+from .utils import get_form_version
+
+PLAN_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class FieldValidator:
+    __slots__ = ("field_id", "slug", "required")
+
+    def __init__(self, field: Field):
+        self.field_id = field.id
+        self.slug = field.slug
+        self.required = field.answer_required
+
+    def error(self, message):
+        return serializers.ValidationError({"data": {self.slug: message}})
+
+    def __call__(self, response):
+        raise NotImplementedError
+
+    def typed_values(self, response) -> list[dict]:
+        """
+        Return the typed ``Answer`` columns of an answer, or nothing when it
+        is not of the type of the field, e.g. after the field type changed.
+        """
+        raise NotImplementedError
+
+
+class TextValidator(FieldValidator):
+    __slots__ = ("min_length", "max_length", "pattern", "error_message")
+
+    def __init__(self, field: Field):
+        super().__init__(field)
+        self.min_length = field.metadata["answer_min_length"]
+        self.max_length = field.metadata["answer_max_length"]
+        regex_value = field.metadata.get("regex_value")
+        self.pattern = re.compile(regex_value) if regex_value else None
+        self.error_message = field.error_message
+
+    def __call__(self, response):
+        if not isinstance(response, str):
+            raise self.error("The answer should be a string.")
+        if len(response) > self.max_length:
+            raise self.error(f"The answer should less than {self.max_length} char.")
+        if len(response) < self.min_length:
+            raise self.error(f"The answer should more than {self.min_length} char.")
+        if self.pattern is not None and not self.pattern.match(response):
+            raise self.error(self.error_message)
+
+    def typed_values(self, response) -> list[dict]:
+        if not isinstance(response, str):
+            return []
+        return [{"text_value": response}]
+
+
+class NumberValidator(FieldValidator):
+    __slots__ = ("min_value", "max_value")
+
+    def __init__(self, field: Field):
+        super().__init__(field)
+        self.min_value = field.metadata["number_min_value"]
+        self.max_value = field.metadata["number_max_value"]
+
+    def __call__(self, response):
+        if not isinstance(response, (int, float)):
+            raise self.error("The answer should be a number(float or int).")
+        if response > self.max_value:
+            raise self.error(f"The answer should less than {self.max_value}.")
+        if response < self.min_value:
+            raise self.error(f"The answer should greater than {self.min_value}.")
+
+    def typed_values(self, response) -> list[dict]:
+        if not isinstance(response, (int, float)):
+            return []
+        return [{"numeric_value": float(response)}]
+
+
+class ChoiceValidator(FieldValidator):
+    __slots__ = ("minimum", "maximum", "choices")
+
+    def __init__(self, field: Field):
+        super().__init__(field)
+        self.minimum = field.metadata["min_selectable_choices"]
+        self.maximum = field.metadata["max_selectable_choices"]
+        self.choices = frozenset(field.metadata["choices"].keys())
+
+    def __call__(self, response):
+        if not isinstance(response, list):
+            raise self.error("The answer should be a list.")
+        if len(response) < self.minimum or len(response) > self.maximum:
+            raise self.error(
+                f"The number of answers should be more than {self.minimum} and less than {self.maximum}."
+            )
+        for e in response:
+            if str(e) not in self.choices:
+                raise self.error(f"{e} is not a valid choice.")
+
+    def typed_values(self, response) -> list[dict]:
+        if not isinstance(response, list):
+            return []
+        return [{"choice": choice} for choice in sorted({str(e) for e in response})]
+
+
+VALIDATORS = {
+    Field.TYPES.SHORT_TXT_INPUT: TextValidator,
+    Field.TYPES.LONG_TXT_INPUT: TextValidator,
+    Field.TYPES.CHOISES_INPUT: ChoiceValidator,
+    Field.TYPES.NUM_INPUT: NumberValidator,
+}
+
+
+class FormValidationPlan:
+    """
+    Precompiled answer rules of a form, built once per form version.
+    """
+
+    def __init__(self, form_id: int, validators: list[FieldValidator]):
+        self.form_id = form_id
+        self.validators = tuple(validators)
+        self.slugs = frozenset(validator.slug for validator in validators)
+
+    def clean(self, data) -> dict:
+        if not isinstance(data, dict):
+            raise serializers.ValidationError(
+                {"data": "The answers should be an object of field slugs."}
+            )
+        for validator in self.validators:
+            response = data.get(validator.slug, None)
+            if response is None:
+                if validator.required and validator.slug not in data:
+                    raise validator.error("This field is required.")
+                continue
+            validator(response)
+        return {k: v for k, v in data.items() if k in self.slugs}
+
+    def typed_answers(self, data: dict) -> list[tuple[int, dict]]:
+        """
+        Return ``(field_id, columns)`` of the typed answers of response data.
+        """
+        answers = []
+        for validator in self.validators:
+            response = data.get(validator.slug)
+            if response is None:
+                continue
+            for values in validator.typed_values(response):
+                answers.append((validator.field_id, values))
+        return answers
+
+
+def build_validation_plan(form: Form) -> FormValidationPlan:
+    validators = [VALIDATORS[field.type](field) for field in form.fields.all()]
+    return FormValidationPlan(form_id=form.id, validators=validators)
+
+
+# the most recently used plans of this process, with their form version
+_local_plans: OrderedDict[int, tuple[str, FormValidationPlan]] = OrderedDict()
+_local_plans_lock = threading.Lock()
+
+
+def get_validation_plan(form: Form) -> FormValidationPlan:
+    version = get_form_version(form.id)
+    with _local_plans_lock:
+        local = _local_plans.get(form.id)
+        if local is not None and local[0] == version:
+            _local_plans.move_to_end(form.id)
+            return local[1]
+
+    key = f"form_plan_v2_{form.id}_{version}"
+    plan = cache.get(key)
+    if plan is None:
+        plan = build_validation_plan(form)
+        cache.set(key, plan, timeout=PLAN_CACHE_TIMEOUT)
+    with _local_plans_lock:
+        _local_plans[form.id] = (version, plan)
+        _local_plans.move_to_end(form.id)
+        while len(_local_plans) > settings.VALIDATION_PLAN_LOCAL_CACHE_SIZE:
+            _local_plans.popitem(last=False)
+    return plan
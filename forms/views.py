@@ -1,5 +1,6 @@
-from django.db.models import F
-from django.db.models.fields.json import KT
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views import View
@@ -10,6 +11,7 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.generics import DestroyAPIView, ListAPIView, RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
 from forms.models import Category, Field, Form, Pipeline
@@ -22,9 +24,18 @@ from forms.serializers import (
     UpdateFieldSerializer,
     UpdateFormSerializer,
 )
+from pagination import OptionalCursorPagination
 from permissions import IsOwnerOrReadOnly
 
+from .access import has_access_grant, issue_access_grant
+from .counters import increment_pipeline_views
+from .projection import ProjectionMixin
 from .models import COMMON_REGEX_TYPES
+from .publishing import (
+    get_pipeline_document,
+    get_respondent_forms,
+    publish_pipeline,
+)
 
 
 # Field API Views
@@ -37,6 +48,7 @@ class CommonRegexApi(APIView):
 class FieldListView(ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = FieldSerializer
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         if self.request.user.is_admin:
@@ -113,9 +125,11 @@ class FieldDeleteView(DestroyAPIView):
 
 
 # Form API Views
-class FormListView(ListAPIView):
+class FormListView(ProjectionMixin, ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = FormSerializer
+    pagination_class = OptionalCursorPagination
+    expandable = ("fields",)
 
     def get_queryset(self):
         category = self.request.query_params.get("category")
@@ -134,11 +148,12 @@ class FormListView(ListAPIView):
         return super().get(*args, **kwargs)
 
 
-class FormDataView(RetrieveAPIView):
+class FormDataView(ProjectionMixin, RetrieveAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = FormSerializer
     lookup_url_kwarg = "form_id"
     lookup_field = "pk"
+    expandable = ("fields",)
 
     def get_queryset(self):
         return Form.objects.filter(owner__id=self.request.user.id)
@@ -189,11 +204,7 @@ class FormDeleteView(DestroyAPIView):
         # May raise a permission denied
         self.check_object_permissions(self.request, obj)
 
-        if (
-            Pipeline.objects.annotate(order=KT("metadata__order"))
-            .filter(order__contains=self.kwargs[lookup_url_kwarg])
-            .exists()
-        ):
+        if obj.pipeline_links.exists():
             raise ValidationError(
                 {
                     "message": "You can't delete this form because it's part of existing pipelines."
@@ -206,9 +217,11 @@ class FormDeleteView(DestroyAPIView):
 
 
 # Pipeline API Views
-class PipelineListView(ListAPIView):
+class PipelineListView(ProjectionMixin, ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = PipelineSerializer
+    pagination_class = OptionalCursorPagination
+    expandable = ("forms", "forms.fields")
 
     def get_queryset(self):
         category = self.request.query_params.get("category")
@@ -227,11 +240,12 @@ class PipelineListView(ListAPIView):
         return super().get(*args, **kwargs)
 
 
-class PipelineDataView(RetrieveAPIView):
+class PipelineDataView(ProjectionMixin, RetrieveAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = PipelineSerializer
     lookup_url_kwarg = "pipeline_id"
     lookup_field = "pk"
+    expandable = ("forms", "forms.fields")
 
     def get_queryset(self):
         return Pipeline.objects.filter(owner__id=self.request.user.id)
@@ -314,27 +328,70 @@ class PipelineShareView(RetrieveAPIView):
     class InputSerializer(serializers.Serializer):
         password = serializers.CharField(required=True)
 
-    def get_object(self):
-        queryset = self.filter_queryset(self.get_queryset())
-        lookup_url_kwarg = self.lookup_url_kwarg
-        filter_kwargs = {
-            self.lookup_field: self.kwargs[lookup_url_kwarg],
-        }
-        obj: Pipeline = get_object_or_404(queryset, **filter_kwargs)
-        if obj.is_private:
+    def retrieve(self, request, *args, **kwargs):
+        document = get_pipeline_document(self.kwargs[self.lookup_url_kwarg])
+        if document is None:
+            raise Http404
+        row = (
+            Pipeline.objects.filter(pk=document["id"])
+            .values_list(
+                "number_of_views", "password", "is_private", "document_version"
+            )
+            .first()
+        )
+        if row is None:
+            raise Http404
+        number_of_views, password, is_private, version = row
+        # a copy that missed a publish, e.g. on the disk of another host
+        if document.get("version") != version:
+            document = publish_pipeline(document["id"])
+            if document is None:
+                raise Http404
+        if is_private and not has_access_grant(
+            request, document["id"], password
+        ):
             serializer = self.InputSerializer(data=self.request.data)
             serializer.is_valid(raise_exception=True)
-            if obj.password != serializer.validated_data["password"]:
+            if not check_password(serializer.validated_data["password"], password):
                 raise ValidationError({"password": "The password is incorrect."})
 
-        self.check_object_permissions(self.request, obj)
-        obj.number_of_views = F("number_of_views") + 1
-        obj.save()
-        obj.refresh_from_db()
-        return obj
+        data = dict(document)
+        data["number_of_views"] = number_of_views + increment_pipeline_views(
+            document["id"]
+        )
+        data["forms"] = get_respondent_forms(document, request)
+        return Response(data)
 
-    def get_queryset(self):
-        return Pipeline.objects.all()
+
+class PipelineUnlockView(APIView):
+    """
+    Check the password of a private pipeline once and return a short-lived
+    grant, which the share and submit calls accept in the ``X-Pipeline-Grant``
+    header instead of the password.
+    """
+
+    throttle_classes = (ScopedRateThrottle,)
+    throttle_scope = "pipeline-unlock"
+
+    class InputSerializer(serializers.Serializer):
+        password = serializers.CharField(required=True)
+
+    def post(self, request, pipeline_slug):
+        pipeline = get_object_or_404(
+            Pipeline.objects.only("id", "is_private", "password"), slug=pipeline_slug
+        )
+        serializer = self.InputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if pipeline.is_private and not pipeline.check_password(
+            serializer.validated_data["password"]
+        ):
+            raise ValidationError({"password": "The password is incorrect."})
+        return Response(
+            data={
+                "grant": issue_access_grant(pipeline.id, pipeline.password),
+                "expires_in": settings.PIPELINE_ACCESS_GRANT_MAX_AGE,
+            }
+        )
 
 
 # Category API Views
@@ -368,6 +425,7 @@ class CategoryUpdateView(APIView):
 class CategoryListView(ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = CategorySerializer
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         if self.request.user.is_admin:
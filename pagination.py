@@ -0,0 +1,40 @@
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class OptionalCursorPagination(LimitOffsetPagination):
+    """
+    Limit/offset pages by default. A request with a ``cursor`` parameter (empty
+    for the first page) is paged by a cursor over ``cursor_ordering`` of the
+    view instead, which seeks on an index and skips the ``COUNT(*)``, so
+    every page costs the same.
+    """
+
+    cursor_query_param = "cursor"
+    cursor_ordering = ("-id",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = None
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.cursor = CursorPagination()
+        self.cursor.cursor_query_param = self.cursor_query_param
+        self.cursor.ordering = getattr(view, "cursor_ordering", self.cursor_ordering)
+        self.cursor.page_size = self.get_limit(request)
+        return self.cursor.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor is not None:
+            return self.cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_schema_operation_parameters(self, view):
+        return super().get_schema_operation_parameters(view) + [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            }
+        ]
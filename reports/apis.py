@@ -1,21 +1,32 @@
+from django.db import transaction
+from django.http import FileResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from rest_framework import status
 from rest_framework.exceptions import PermissionDenied, ValidationError
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import ListAPIView, RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from forms.models import Pipeline
+from pagination import OptionalCursorPagination
 from responses.models import PipelineSubmission
+from responses.utils import with_answered_responses
 
-from .models import Subscriber
-from .serializers import ResponseReportSerializer
+from .exports import EXPORT_TYPES, aiter_export
+from .models import ResponseExport, Subscriber
+from .serializers import ResponseExportSerializer, ResponseReportSerializer
+from .tasks import build_response_export
 
 
 class PeriodicReportApi(ListAPIView):
     permission_classes = (IsAuthenticated,)
     serializer_class = ResponseReportSerializer
+    pagination_class = OptionalCursorPagination
+    # cursors seek on their first ordering column only, and updated_at
+    # changes with every answer, which would skip or repeat submissions
+    cursor_ordering = ("id",)
     lookup_url_kwarg = "pipeline_id"
     lookup_field = "pk"
 
@@ -39,8 +50,12 @@ class PeriodicReportApi(ListAPIView):
                 )
         else:
             time_query = now - timezone.timedelta(days=30)
-        return PipelineSubmission.objects.filter(
-            pipeline__owner__id=self.request.user.id, updated_at__gte=time_query
+        return with_answered_responses(
+            PipelineSubmission.objects.select_related("owner")
+            .filter(
+                pipeline__owner__id=self.request.user.id, updated_at__gte=time_query
+            )
+            .order_by("id")
         )
 
 
@@ -57,3 +72,79 @@ class SubsrcribeReportApi(APIView):
             data={"message": "You subscribed successfully."},
             status=201,
         )
+
+
+class PipelineExportApi(APIView):
+    """
+    Stream every submission of a pipeline as ``?type=csv`` (default) or
+    ``?type=ndjson``, with one column per field.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, pipeline_id):
+        pipeline = get_object_or_404(Pipeline, pk=pipeline_id)
+        if pipeline.owner != request.user:
+            raise PermissionDenied("You are not not owner.")
+
+        type = request.query_params.get("type", "csv")
+        if type not in EXPORT_TYPES:
+            raise ValidationError(
+                {"type": f"It should be one of the following: {list(EXPORT_TYPES)}."}
+            )
+        response = StreamingHttpResponse(
+            aiter_export(pipeline, type), content_type=EXPORT_TYPES[type]
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="pipeline-{pipeline.id}.{type}"'
+        )
+        return response
+
+
+class ResponseExportApi(APIView):
+    """
+    Start writing a Parquet export of every submission of a pipeline, with
+    typed numeric, choice and text columns.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def post(self, request, pipeline_id):
+        pipeline = get_object_or_404(Pipeline, pk=pipeline_id)
+        if pipeline.owner != request.user:
+            raise PermissionDenied("You are not not owner.")
+
+        export = ResponseExport.objects.create(pipeline=pipeline, owner=request.user)
+        transaction.on_commit(lambda: build_response_export.delay(export.id))
+        return Response(
+            data=ResponseExportSerializer(instance=export).data,
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class ResponseExportRetrieveApi(RetrieveAPIView):
+    permission_classes = (IsAuthenticated,)
+    serializer_class = ResponseExportSerializer
+    lookup_field = "pk"
+    lookup_url_kwarg = "export_id"
+
+    def get_queryset(self):
+        return ResponseExport.objects.filter(owner__id=self.request.user.id)
+
+
+class ResponseExportDownloadApi(APIView):
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, export_id):
+        export = get_object_or_404(
+            ResponseExport,
+            pk=export_id,
+            owner__id=request.user.id,
+            status=ResponseExport.STATUSES.DONE,
+        )
+        return FileResponse(
+            export.file.open("rb"),
+            as_attachment=True,
+            filename=f"pipeline-{export.pipeline_id}.parquet",
+            content_type="application/vnd.apache.parquet",
+        )
@@ -0,0 +1,104 @@
+import uuid
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+
+from core.celery import schedule_once
+
+from .state import advance_report_state
+
+
+def get_report_group_name(phone: str, pipeline_id: int) -> str:
+    return f"report_{phone}_{pipeline_id}"
+
+
+def get_dirty_key(pipeline_id: int) -> str:
+    return f"report_dirty_{pipeline_id}"
+
+
+def get_listeners_key(pipeline_id: int) -> str:
+    return f"report_listeners_{pipeline_id}"
+
+
+def get_report_version(pipeline_id: int) -> str:
+    """
+    Return the current version token of the responses of a pipeline. Like
+    form versions, tokens are random so an evicted version never comes back.
+    """
+    key = f"report_version_{pipeline_id}"
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_report_version(pipeline_id: int) -> None:
+    cache.set(f"report_version_{pipeline_id}", uuid.uuid4().hex, timeout=None)
+
+
+def add_listener(pipeline_id: int) -> None:
+    key = get_listeners_key(pipeline_id)
+    timeout = settings.REPORT_LISTENERS_TTL
+    if not cache.add(key, 1, timeout=timeout):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # expired between add and incr
+            cache.add(key, 1, timeout=timeout)
+        cache.touch(key, timeout=timeout)
+
+
+def remove_listener(pipeline_id: int) -> None:
+    try:
+        cache.decr(get_listeners_key(pipeline_id))
+    except ValueError:
+        pass
+
+
+def touch_listeners(pipeline_id: int) -> None:
+    """
+    Keep the listener count alive. Counts of crashed consumers are never
+    decremented, so they are only trusted while someone keeps touching them.
+    """
+    cache.touch(get_listeners_key(pipeline_id), timeout=settings.REPORT_LISTENERS_TTL)
+
+
+def has_listeners(pipeline_id: int) -> bool:
+    return (cache.get(get_listeners_key(pipeline_id)) or 0) > 0
+
+
+def mark_report_dirty(pipeline_id: int) -> None:
+    """
+    Schedule a report broadcast for a pipeline, at most once per
+    ``REPORT_BROADCAST_WINDOW`` seconds. Changes made while a broadcast is
+    pending are covered by that broadcast. Only the report version is bumped
+    while no ``FormReportConsumer`` is listening to the pipeline.
+    """
+    from .tasks import broadcast_pipeline_report
+
+    bump_report_version(pipeline_id)
+    if not has_listeners(pipeline_id):
+        return
+    schedule_once(
+        get_dirty_key(pipeline_id),
+        broadcast_pipeline_report,
+        settings.REPORT_BROADCAST_WINDOW,
+        args=(pipeline_id,),
+    )
+
+
+def publish_report(pipeline, report: dict) -> dict:
+    """
+    Advance the report state of a pipeline and send the delta, if any, to
+    its ``FormReportConsumer``s. Return the new state.
+    """
+    state, patch = advance_report_state(pipeline.id, report)
+    if patch:
+        async_to_sync(get_channel_layer().group_send)(
+            get_report_group_name(pipeline.owner.phone, pipeline.id),
+            {"type": "report_delta", "seq": state["seq"], "patch": patch},
+        )
+    return state
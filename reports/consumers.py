@@ -1,4 +1,6 @@
+import asyncio
 import json
+from urllib.parse import parse_qs
 
 from asgiref.sync import sync_to_async
 from channels.db import database_sync_to_async
@@ -6,12 +8,35 @@ from channels.generic.websocket import (
     AsyncJsonWebsocketConsumer,
     AsyncWebsocketConsumer,
 )
+from django.conf import settings
 
 from forms.models import Pipeline
-from reports.utils import acreate_new_report
+from reports.broadcast import (
+    add_listener,
+    get_report_group_name,
+    publish_report,
+    remove_listener,
+    touch_listeners,
+)
+from reports.snapshots import aget_report_snapshot
+from reports.state import get_deltas_since, get_report_state
 
 
 class FormReportConsumer(AsyncWebsocketConsumer):
+    """
+    Send the report of a pipeline to its owner as a ``snapshot`` followed by
+    ``delta``s, each with a sequence number and a JSON-patch of the report.
+
+    A client that reconnects with ``?last_seq=<seq>`` only gets the deltas it
+    missed, or a new snapshot when they are no longer kept. The same goes for
+    a delta that arrives ahead of one still on its way, so deltas are always
+    sent in sequence.
+    """
+
+    pipeline_id = None
+    heartbeat = None
+    seq = 0
+
     async def connect(self):
         user = self.scope["user"]
         pipline_id = self.scope["url_route"]["kwargs"]["pipeline_id"]
@@ -35,13 +60,27 @@ class FormReportConsumer(AsyncWebsocketConsumer):
                 await self.close()
             else:
                 self.room_name = user.phone
-                self.room_group_name = f"report_{self.room_name}_{pipline_id}"
+                self.room_group_name = get_report_group_name(
+                    self.room_name, pipline_id
+                )
+                self.pipeline_id = pipline.id
+                await sync_to_async(add_listener)(self.pipeline_id)
+                self.heartbeat = asyncio.create_task(self.keep_listening())
+                await self.accept()
+                report = await aget_report_snapshot(pipline)
+                state = await sync_to_async(publish_report)(pipline, report)
                 await self.channel_layer.group_add(
                     self.room_group_name, self.channel_name
                 )
-                await self.accept()
-                response = await acreate_new_report(pipeline=pipline)
-                await self.send(text_data=json.dumps(response))
+                # deltas published before joining the group are in the state
+                state = await sync_to_async(get_report_state)(pipline.id) or state
+                query = parse_qs(self.scope["query_string"].decode())
+                last_seq = None
+                try:
+                    last_seq = int(query["last_seq"][0])
+                except (KeyError, ValueError):
+                    pass
+                await self.catch_up(state, last_seq)
         else:
             self.room_group_name = "perrmission_denied"
             await self.channel_layer.group_add(self.room_group_name, self.channel_name)
@@ -55,8 +94,40 @@ class FormReportConsumer(AsyncWebsocketConsumer):
             )
             await self.close()
 
+    async def catch_up(self, state: dict, last_seq: int | None):
+        """
+        Send the deltas of ``state`` after ``last_seq``, or a snapshot when
+        they are no longer kept.
+        """
+        deltas = None
+        if last_seq is not None:
+            deltas = get_deltas_since(state, last_seq)
+        if deltas is None:
+            await self.send(
+                text_data=json.dumps(
+                    {"type": "snapshot", "seq": state["seq"], "report": state["report"]}
+                )
+            )
+        else:
+            for seq, patch in deltas:
+                await self.send_delta(seq, patch)
+        self.seq = state["seq"]
+
+    async def send_delta(self, seq: int, patch: list):
+        await self.send(
+            text_data=json.dumps({"type": "delta", "seq": seq, "patch": patch})
+        )
+
     async def disconnect(self, close_code):
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
+        if self.pipeline_id is not None:
+            self.heartbeat.cancel()
+            await sync_to_async(remove_listener)(self.pipeline_id)
+
+    async def keep_listening(self):
+        while True:
+            await asyncio.sleep(settings.REPORT_LISTENERS_TTL / 3)
+            await sync_to_async(touch_listeners)(self.pipeline_id)
 
     async def receive(self, text_data):
         text_data_json = json.loads(text_data)
@@ -69,3 +140,17 @@ class FormReportConsumer(AsyncWebsocketConsumer):
     async def form_response(self, event):
         message = event["message"]
         await self.send(text_data=json.dumps({"message": message}))
+
+    async def report_delta(self, event):
+        # already covered by the snapshot or deltas sent before
+        if event["seq"] <= self.seq:
+            return
+        if event["seq"] != self.seq + 1:
+            # publishers send after storing the state, so an earlier delta is
+            # still on its way or was lost; the state already has it
+            state = await sync_to_async(get_report_state)(self.pipeline_id)
+            if state is not None and state["seq"] >= event["seq"]:
+                await self.catch_up(state, self.seq)
+                return
+        self.seq = event["seq"]
+        await self.send_delta(event["seq"], event["patch"])
@@ -0,0 +1,129 @@
+import asyncio
+import math
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Q
+
+from forms.counters import get_number_of_views
+from forms.models import Field, Form, Pipeline
+from forms.utils import get_pipeline_forms
+from responses.models import PipelineSubmission
+
+from .statistics import aggregate_form_statistics, get_pipeline_statistics
+
+
+def get_form_statistics(pipeline_id: int, form: Form, stored: dict) -> dict:
+    """
+    Return the statistics of a form keyed by ``(form_id, field_id)``.
+
+    Stored running statistics are used when the form has any; otherwise,
+    e.g. for responses written before the statistics existed, they are
+    aggregated from the raw responses.
+    """
+    statistics = {
+        key: statistic for key, statistic in stored.items() if key[0] == form.id
+    }
+    if statistics:
+        return statistics
+    return {
+        (statistic.form_id, statistic.field_id): statistic
+        for statistic in aggregate_form_statistics(pipeline_id, form)
+    }
+
+
+def build_form_report(
+    pipeline_id: int, form: Form, stored: dict, complete_responses: int
+) -> dict:
+    REPORT = {}
+    statistics = get_form_statistics(pipeline_id, form, stored)
+    for field in form.fields.all():
+        statistic = statistics.get((form.id, field.id))
+        if field.type == Field.TYPES.NUM_INPUT:
+            REPORT[field.slug] = {}
+            if statistic is None or statistic.count == 0:
+                REPORT[field.slug]["average"] = None
+                REPORT[field.slug]["standard_deviation"] = None
+                REPORT[field.slug]["maximum_value"] = None
+                REPORT[field.slug]["minimum_value"] = None
+                continue
+            average = statistic.total / statistic.count
+            variance = max(statistic.total_squares / statistic.count - average**2, 0)
+            REPORT[field.slug]["average"] = average
+            REPORT[field.slug]["standard_deviation"] = math.sqrt(variance)
+            REPORT[field.slug]["maximum_value"] = statistic.maximum
+            REPORT[field.slug]["minimum_value"] = statistic.minimum
+        elif field.type == Field.TYPES.CHOISES_INPUT:
+            REPORT[field.slug] = {}
+            choice_counts = statistic.choice_counts if statistic is not None else {}
+            for id, value in field.metadata["choices"].items():
+                if complete_responses != 0:
+                    REPORT[field.slug][
+                        value
+                    ] = f"{choice_counts.get(id, 0)*100/complete_responses}%"
+                else:
+                    REPORT[field.slug][value] = "0%"
+    return REPORT
+
+
+def get_report_header(pipeline: Pipeline) -> dict:
+    counts = PipelineSubmission.objects.filter(pipeline__id=pipeline.id).aggregate(
+        total=Count("id"), complete=Count("id", filter=Q(is_completed=True))
+    )
+    return {
+        "total_responses": counts["total"],
+        "complete_responses": counts["complete"],
+        "number_of_visit": get_number_of_views(pipeline),
+    }
+
+
+def create_new_report(pipeline: Pipeline) -> dict:
+    output = get_report_header(pipeline)
+    stored = get_pipeline_statistics(pipeline.id)
+    RESPNSES = {}
+    for form in get_pipeline_forms(pipeline.id):
+        RESPNSES[form.title] = build_form_report(
+            pipeline.id, form, stored, output["complete_responses"]
+        )
+    output["responses"] = RESPNSES
+    return output
+
+
+def in_worker_thread(func):
+    """
+    Run ``func`` in its own executor thread so that independent queries can
+    run at the same time, each on the connection of its thread.
+    """
+
+    def wrapper(*args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(wrapper, thread_sensitive=False)
+
+
+async def acreate_new_report(pipeline: Pipeline) -> dict:
+    """
+    Same report as ``create_new_report``, with the per-form queries running
+    concurrently, at most ``REPORT_QUERY_CONCURRENCY`` at a time.
+    """
+    output, stored, forms = await asyncio.gather(
+        in_worker_thread(get_report_header)(pipeline),
+        in_worker_thread(get_pipeline_statistics)(pipeline.id),
+        in_worker_thread(get_pipeline_forms)(pipeline.id),
+    )
+    semaphore = asyncio.Semaphore(settings.REPORT_QUERY_CONCURRENCY)
+
+    async def form_report(form: Form) -> dict:
+        async with semaphore:
+            return await in_worker_thread(build_form_report)(
+                pipeline.id, form, stored, output["complete_responses"]
+            )
+
+    reports = await asyncio.gather(*(form_report(form) for form in forms))
+    output["responses"] = {form.title: report for form, report in zip(forms, reports)}
+    return output
@@ -0,0 +1,44 @@
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from forms.models import Pipeline
+from reports.exports import iter_ndjson, write_parquet
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the submissions of a pipeline as NDJSON and as Parquet, and "
+        "compare their size and build time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("pipeline", type=int, help="Pipeline id to export.")
+
+    def handle(self, *args, **options):
+        pipeline = Pipeline.objects.get(pk=options["pipeline"])
+        results = {
+            "ndjson": self.measure(lambda file: self.write_ndjson(pipeline, file)),
+            "parquet": self.measure(lambda file: write_parquet(pipeline, file)),
+        }
+        for name, (size, seconds) in results.items():
+            self.stdout.write(f"{name}: {size} bytes in {seconds:.3f}s")
+        (ndjson_size, ndjson_seconds), (parquet_size, parquet_seconds) = (
+            results.values()
+        )
+        self.stdout.write(
+            f"parquet is {ndjson_size / max(parquet_size, 1):.1f}x smaller and "
+            f"{ndjson_seconds / max(parquet_seconds, 1e-9):.1f}x as fast"
+        )
+
+    def write_ndjson(self, pipeline: Pipeline, file):
+        for line in iter_ndjson(pipeline):
+            file.write(line.encode())
+
+    def measure(self, write) -> tuple[int, float]:
+        with tempfile.TemporaryFile() as file:
+            start = time.perf_counter()
+            write(file)
+            seconds = time.perf_counter() - start
+            return file.tell(), seconds
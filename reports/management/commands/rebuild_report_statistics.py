@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from forms.models import Pipeline
+from forms.utils import get_pipeline_forms
+from reports.broadcast import bump_report_version
+from reports.statistics import aggregate_form_statistics
+from reports.models import FieldStatistic
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-field report statistics from the raw responses."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pipeline",
+            type=int,
+            action="append",
+            dest="pipelines",
+            help="Only rebuild the given pipeline id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        pipelines = Pipeline.objects.all()
+        if options["pipelines"]:
+            pipelines = pipelines.filter(id__in=options["pipelines"])
+
+        for pipeline_id in pipelines.values_list("id", flat=True).iterator():
+            count = self.rebuild(pipeline_id)
+            self.stdout.write(f"pipeline {pipeline_id}: {count} statistics rebuilt")
+
+    def rebuild(self, pipeline_id: int) -> int:
+        statistics = []
+        with transaction.atomic():
+            FieldStatistic.objects.filter(pipeline_id=pipeline_id).delete()
+            for form in get_pipeline_forms(pipeline_id):
+                statistics += aggregate_form_statistics(pipeline_id, form)
+            FieldStatistic.objects.bulk_create(statistics, batch_size=1000)
+        bump_report_version(pipeline_id)
+        return len(statistics)
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.7 on 2026-10-18 11:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0010_backfill_pipelineform'),
+        ('reports', '0002_subscriber_pipeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FieldStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.BigIntegerField(default=0)),
+                ('total', models.FloatField(default=0)),
+                ('total_squares', models.FloatField(default=0)),
+                ('minimum', models.FloatField(blank=True, null=True)),
+                ('maximum', models.FloatField(blank=True, null=True)),
+                ('choice_counts', models.JSONField(default=dict)),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='forms.field')),
+                ('form', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='forms.form')),
+                ('pipeline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='forms.pipeline')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='fieldstatistic',
+            constraint=models.UniqueConstraint(fields=('pipeline', 'form', 'field'), name='field_statistic_uniq'),
+        ),
+    ]
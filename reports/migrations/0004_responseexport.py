@@ -0,0 +1,32 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:10
+
+import django.db.models.deletion
+import reports.models
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0010_backfill_pipelineform'),
+        ('reports', '0003_fieldstatistic'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResponseExport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'pending'), (2, 'done'), (3, 'failed')], default=1)),
+                ('file', models.FileField(blank=True, storage=reports.models.get_export_storage, upload_to='')),
+                ('rows', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('pipeline', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='forms.pipeline')),
+            ],
+        ),
+    ]
@@ -1,8 +1,12 @@
+import uuid
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.utils import timezone
 
-from forms.models import Pipeline
+from forms.models import Field, Form, Pipeline
 
 
 def set_default_expired_datetime():
@@ -10,7 +14,57 @@ def set_default_expired_datetime():
     return now + timezone.timedelta(days=30)
 
 
+def get_export_storage():
+    return FileSystemStorage(location=settings.RESPONSE_EXPORTS_DIR)
+
+
 class Subscriber(models.Model):
     user = models.ForeignKey(to=get_user_model(), on_delete=models.CASCADE)
     pipeline = models.ForeignKey(to=Pipeline, on_delete=models.CASCADE)
     expired_datetime = models.DateTimeField(default=set_default_expired_datetime)
+
+
+class FieldStatistic(models.Model):
+    """
+    Running statistics of a field over the completed submissions of a pipeline.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["pipeline", "form", "field"], name="field_statistic_uniq"
+            ),
+        ]
+
+    pipeline = models.ForeignKey(to=Pipeline, on_delete=models.CASCADE)
+    form = models.ForeignKey(to=Form, on_delete=models.CASCADE)
+    field = models.ForeignKey(to=Field, on_delete=models.CASCADE)
+    count = models.BigIntegerField(default=0)
+    total = models.FloatField(default=0)
+    total_squares = models.FloatField(default=0)
+    minimum = models.FloatField(null=True, blank=True)
+    maximum = models.FloatField(null=True, blank=True)
+    choice_counts = models.JSONField(default=dict)
+
+
+class ResponseExport(models.Model):
+    """
+    A Parquet file of the submissions of a pipeline, written by
+    ``build_response_export`` for its owner to download.
+    """
+
+    class STATUSES(models.IntegerChoices):
+        PENDING = 1, "pending"
+        DONE = 2, "done"
+        FAILED = 3, "failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    pipeline = models.ForeignKey(to=Pipeline, on_delete=models.CASCADE)
+    owner = models.ForeignKey(to=get_user_model(), on_delete=models.CASCADE)
+    status = models.PositiveSmallIntegerField(
+        choices=STATUSES, default=STATUSES.PENDING
+    )
+    file = models.FileField(storage=get_export_storage, blank=True)
+    rows = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
@@ -1,6 +1,9 @@
+from django.urls import reverse
 from rest_framework import serializers
 
-from responses.models import PipelineSubmission, Response
+from responses.models import PipelineSubmission
+
+from .models import ResponseExport
 
 # class PipelineReportSerializer(serializers.ModelSerializer):
 
@@ -8,23 +11,43 @@ from responses.models import PipelineSubmission, Response
 class ResponseReportSerializer(serializers.ModelSerializer):
     responsed_forms = serializers.SerializerMethodField()
     responses = serializers.SerializerMethodField()
+    owner = serializers.SerializerMethodField()
 
     class Meta:
         model = PipelineSubmission
         exclude = ("pipeline",)
-        depth = 2
+
+    # the responses are prefetched by responses.utils.with_answered_responses
 
     def get_responsed_forms(self, obj: PipelineSubmission):
-        return obj.responses["responsed_forms"]
+        return [response.form_id for response in obj.answered_responses]
 
     def get_responses(self, obj: PipelineSubmission):
-        RESPONSES = {}
-
-        for form_id in obj.responses["responsed_forms"]:
-            response = Response.objects.get(
-                form__id=form_id,
-                pipeline__id=obj.pipeline.id,
-                pipeline_submission__id=obj.id,
-            )
-            RESPONSES[form_id] = response.data
-        return RESPONSES
+        return {response.form_id: response.data for response in obj.answered_responses}
+
+    def get_owner(self, obj: PipelineSubmission):
+        return obj.owner.email if obj.owner is not None else None
+
+
+class ResponseExportSerializer(serializers.ModelSerializer):
+    status = serializers.CharField(source="get_status_display")
+    download = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ResponseExport
+        fields = [
+            "id",
+            "pipeline",
+            "status",
+            "rows",
+            "created_at",
+            "finished_at",
+            "download",
+        ]
+
+    def get_download(self, obj: ResponseExport):
+        if obj.status != ResponseExport.STATUSES.DONE:
+            return None
+        return reverse(
+            "api:reports:download-response-export", kwargs={"export_id": obj.id}
+        )
@@ -0,0 +1,66 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from forms.models import Pipeline
+
+from .broadcast import get_report_version
+from .engine import acreate_new_report
+
+# in-flight snapshot computations of this process keyed by (pipeline id, version)
+_inflight: dict[tuple[int, str], asyncio.Future] = {}
+
+
+def get_snapshot_key(pipeline_id: int, version: str) -> str:
+    return f"report_snapshot_{pipeline_id}_{version}"
+
+
+async def aget_report_snapshot(pipeline: Pipeline) -> dict:
+    """
+    Return the report of a pipeline for a connecting websocket.
+
+    Concurrent callers of one process share a single computation, and callers
+    of other processes wait on a cache lock for it. The result is reused for
+    ``REPORT_SNAPSHOT_TTL`` seconds as long as no response of the pipeline
+    changes.
+    """
+    version = await sync_to_async(get_report_version)(pipeline.id)
+    key = (pipeline.id, version)
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(compute_report_snapshot(pipeline, version))
+        _inflight[key] = future
+        future.add_done_callback(lambda _: _inflight.pop(key, None))
+    # a disconnecting caller must not cancel the computation of the others
+    return await asyncio.shield(future)
+
+
+async def compute_report_snapshot(pipeline: Pipeline, version: str) -> dict:
+    key = get_snapshot_key(pipeline.id, version)
+    lock_key = f"{key}_lock"
+    ttl = settings.REPORT_SNAPSHOT_TTL
+    report = await cache.aget(key)
+    if report is not None:
+        return report
+
+    locked = await cache.aadd(lock_key, 1, timeout=ttl * 6)
+    if not locked:
+        # another process is computing it
+        while await cache.aget(lock_key) is not None:
+            await asyncio.sleep(0.1)
+            report = await cache.aget(key)
+            if report is not None:
+                return report
+        report = await cache.aget(key)
+        if report is not None:
+            return report
+
+    try:
+        report = await acreate_new_report(pipeline)
+        await cache.aset(key, report, timeout=ttl)
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+    return report
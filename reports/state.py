@@ -0,0 +1,91 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def get_state_key(pipeline_id: int) -> str:
+    return f"report_state_{pipeline_id}"
+
+
+def escape_pointer(key) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def diff_report(old, new, path: str = "") -> list[dict]:
+    """
+    Return JSON-patch style operations that turn ``old`` into ``new``.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in new.items():
+            pointer = f"{path}/{escape_pointer(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": pointer, "value": value})
+            else:
+                ops += diff_report(old[key], value, pointer)
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{escape_pointer(key)}"})
+        return ops
+    if old != new:
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
+
+
+def get_report_state(pipeline_id: int) -> dict | None:
+    """
+    Return ``{"seq", "report", "deltas"}`` of a pipeline, where ``deltas`` is
+    the ring buffer of the last ``REPORT_DELTA_HISTORY`` ``[seq, patch]``.
+    """
+    return cache.get(get_state_key(pipeline_id))
+
+
+def advance_report_state(pipeline_id: int, report: dict) -> tuple[dict, list]:
+    """
+    Store a new report and return the state and the patch that led to it. The
+    patch is empty and the state left as it was when nothing changed.
+
+    A fresh state starts its sequence at the current time in milliseconds, so
+    numbers keep increasing even after the state was evicted from the cache.
+    """
+    lock_key = f"{get_state_key(pipeline_id)}_lock"
+    for _ in range(50):
+        locked = cache.add(lock_key, 1, timeout=10)
+        if locked:
+            break
+        time.sleep(0.1)
+    try:
+        state = get_report_state(pipeline_id)
+        if state is None:
+            seq = int(time.time() * 1000)
+            patch = [{"op": "replace", "path": "", "value": report}]
+            deltas = []
+        else:
+            patch = diff_report(state["report"], report)
+            if not patch:
+                return state, patch
+            seq = state["seq"] + 1
+            deltas = state["deltas"]
+        deltas = (deltas + [[seq, patch]])[-settings.REPORT_DELTA_HISTORY :]
+        state = {"seq": seq, "report": report, "deltas": deltas}
+        cache.set(get_state_key(pipeline_id), state, timeout=None)
+        return state, patch
+    finally:
+        if locked:
+            cache.delete(lock_key)
+
+
+def get_deltas_since(state: dict, last_seq: int) -> list | None:
+    """
+    Return the ``[seq, patch]`` entries after ``last_seq``, or ``None`` when
+    the ring buffer no longer reaches back that far.
+    """
+    if last_seq > state["seq"]:
+        return None
+    if last_seq == state["seq"]:
+        return []
+    deltas = [delta for delta in state["deltas"] if delta[0] > last_seq]
+    if not deltas or deltas[0][0] != last_seq + 1:
+        return None
+    return deltas
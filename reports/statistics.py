@@ -0,0 +1,283 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+
+from forms.models import Field, Form
+from responses.models import Answer, PipelineSubmission, Response
+
+from .models import FieldStatistic
+
+STATISTIC_TYPES = (Field.TYPES.NUM_INPUT, Field.TYPES.CHOISES_INPUT)
+
+
+class StatisticAccumulator:
+    """
+    Running count, sum, sum of squares, min, max and choice counters of one
+    field. Values are added with ``sign=1`` and removed with ``sign=-1``.
+    """
+
+    def __init__(self, statistic: FieldStatistic, field: dict):
+        self.statistic = statistic
+        self.field_type = field["type"]
+        self.stale_extremes = False
+
+    def apply(self, value, sign: int):
+        statistic = self.statistic
+        if value is None:
+            return
+        if self.field_type == Field.TYPES.NUM_INPUT:
+            if not isinstance(value, (int, float)):
+                return
+            value = float(value)
+            statistic.count += sign
+            statistic.total += sign * value
+            statistic.total_squares += sign * value * value
+            if sign > 0:
+                if statistic.minimum is None or value < statistic.minimum:
+                    statistic.minimum = value
+                if statistic.maximum is None or value > statistic.maximum:
+                    statistic.maximum = value
+            elif value in (statistic.minimum, statistic.maximum):
+                self.stale_extremes = True
+        else:
+            if not isinstance(value, list):
+                return
+            statistic.count += sign
+            for choice in {str(e) for e in value}:
+                statistic.choice_counts[choice] = (
+                    statistic.choice_counts.get(choice, 0) + sign
+                )
+
+
+def get_statistic_fields(form_ids) -> dict[int, list[dict]]:
+    rows = Form.fields.through.objects.filter(
+        form_id__in=form_ids, field__type__in=STATISTIC_TYPES
+    ).values("form_id", "field_id", "field__slug", "field__type")
+    fields = defaultdict(list)
+    for row in rows:
+        fields[row["form_id"]].append(
+            {
+                "id": row["field_id"],
+                "slug": row["field__slug"],
+                "type": row["field__type"],
+            }
+        )
+    return fields
+
+
+def aggregate_form_statistics(pipeline_id: int, form: Form) -> list[FieldStatistic]:
+    """
+    Compute the statistics of every numeric and choice field of a form over
+    the completed submissions of a pipeline from their typed answers, with
+    a single query of aggregates filtered per field and per choice.
+
+    The returned rows are not saved.
+    """
+    fields = [
+        field
+        for field in form.fields.all()
+        if field.type in (Field.TYPES.NUM_INPUT, Field.TYPES.CHOISES_INPUT)
+    ]
+    if not fields:
+        return []
+
+    aggregates = {}
+    for field in fields:
+        of_field = Q(field_id=field.id)
+        aggregates[f"count_{field.id}"] = Count(
+            "response_id", distinct=True, filter=of_field
+        )
+        if field.type == Field.TYPES.NUM_INPUT:
+            aggregates[f"total_{field.id}"] = Sum("numeric_value", filter=of_field)
+            aggregates[f"total_squares_{field.id}"] = Sum(
+                F("numeric_value") * F("numeric_value"), filter=of_field
+            )
+            aggregates[f"minimum_{field.id}"] = Min("numeric_value", filter=of_field)
+            aggregates[f"maximum_{field.id}"] = Max("numeric_value", filter=of_field)
+        else:
+            # choices are keyed by position, their keys are not valid aliases
+            for index, choice in enumerate(field.metadata["choices"]):
+                aggregates[f"choice_{field.id}_{index}"] = Count(
+                    "id", filter=of_field & Q(choice=choice)
+                )
+    row = Answer.objects.filter(
+        field_id__in=[field.id for field in fields],
+        response__pipeline_id=pipeline_id,
+        response__form_id=form.id,
+        response__pipeline_submission__is_completed=True,
+    ).aggregate(**aggregates)
+
+    statistics = []
+    for field in fields:
+        statistic = FieldStatistic(
+            pipeline_id=pipeline_id,
+            form_id=form.id,
+            field_id=field.id,
+            count=row[f"count_{field.id}"],
+        )
+        if field.type == Field.TYPES.NUM_INPUT:
+            statistic.total = row[f"total_{field.id}"] or 0
+            statistic.total_squares = row[f"total_squares_{field.id}"] or 0
+            statistic.minimum = row[f"minimum_{field.id}"]
+            statistic.maximum = row[f"maximum_{field.id}"]
+        else:
+            statistic.choice_counts = {
+                choice: row[f"choice_{field.id}_{index}"]
+                for index, choice in enumerate(field.metadata["choices"])
+            }
+        statistics.append(statistic)
+    return statistics
+
+
+def seed_statistics(
+    pipeline_id: int, form_ids: set, changes: list, fields: dict
+) -> list[FieldStatistic]:
+    """
+    Aggregate the statistics of forms that have no rows yet from the answers
+    already written, so that the responses given before a form's first
+    recorded submission are counted too.
+
+    The answers include the caller's own ``changes``, which are taken back
+    out here because the caller goes on to apply them.
+    """
+    statistics = []
+    for form in Form.objects.filter(id__in=form_ids).prefetch_related("fields"):
+        form_statistics = {
+            statistic.field_id: statistic
+            for statistic in aggregate_form_statistics(pipeline_id, form)
+        }
+        for form_id, data, sign in changes:
+            if form_id != form.id:
+                continue
+            for field in fields[form_id]:
+                statistic = form_statistics.get(field["id"])
+                if statistic is not None:
+                    StatisticAccumulator(statistic, field).apply(
+                        data.get(field["slug"]), -sign
+                    )
+        statistics += form_statistics.values()
+    return statistics
+
+
+def apply_changes(pipeline_id: int, changes: list[tuple[int, dict, int]]) -> None:
+    """
+    Apply ``(form_id, data, sign)`` changes of one pipeline to its statistics.
+
+    The statistic rows are locked for the rest of the caller's transaction.
+    Rows are only created when adding values, so removals that happen while
+    a pipeline is being deleted never recreate them, and are seeded with the
+    answers given before.
+    """
+    form_ids = {form_id for form_id, _, _ in changes}
+    fields = get_statistic_fields(form_ids)
+    if not fields:
+        return
+
+    with transaction.atomic():
+        if any(sign > 0 for _, _, sign in changes):
+            existing = set(
+                FieldStatistic.objects.filter(
+                    pipeline_id=pipeline_id, form_id__in=form_ids
+                ).values_list("form_id", "field_id")
+            )
+            missing = {
+                form_id
+                for form_id, form_fields in fields.items()
+                for field in form_fields
+                if (form_id, field["id"]) not in existing
+            }
+            if missing:
+                FieldStatistic.objects.bulk_create(
+                    seed_statistics(pipeline_id, missing, changes, fields),
+                    ignore_conflicts=True,
+                )
+        statistics = {
+            (statistic.form_id, statistic.field_id): statistic
+            for statistic in FieldStatistic.objects.select_for_update().filter(
+                pipeline_id=pipeline_id, form_id__in=form_ids
+            )
+        }
+        accumulators = {}
+        for form_id, data, sign in changes:
+            for field in fields.get(form_id, []):
+                statistic = statistics.get((form_id, field["id"]))
+                if statistic is None:
+                    continue
+                accumulator = accumulators.get(statistic.id)
+                if accumulator is None:
+                    accumulator = StatisticAccumulator(statistic, field)
+                    accumulators[statistic.id] = accumulator
+                accumulator.apply(data.get(field["slug"]), sign)
+
+        for accumulator in accumulators.values():
+            if accumulator.stale_extremes:
+                refresh_extremes(accumulator.statistic)
+        FieldStatistic.objects.bulk_update(
+            [accumulator.statistic for accumulator in accumulators.values()],
+            [
+                "count",
+                "total",
+                "total_squares",
+                "minimum",
+                "maximum",
+                "choice_counts",
+            ],
+        )
+
+
+def refresh_extremes(statistic: FieldStatistic) -> None:
+    # a removed value was the minimum or maximum, so scan the remaining ones
+    agg = Answer.objects.filter(
+        field_id=statistic.field_id,
+        numeric_value__isnull=False,
+        response__pipeline_id=statistic.pipeline_id,
+        response__form_id=statistic.form_id,
+        response__pipeline_submission__is_completed=True,
+    ).aggregate(min=Min("numeric_value"), max=Max("numeric_value"))
+    statistic.minimum = agg["min"]
+    statistic.maximum = agg["max"]
+
+
+def record_submission(submission: PipelineSubmission) -> None:
+    """
+    Add every response of a submission that has just been completed.
+    """
+    record_submissions([submission])
+
+
+def record_submissions(submissions: list[PipelineSubmission]) -> None:
+    """
+    Add every response of submissions that have just been completed, with
+    one change per pipeline, so that seeding a pipeline's statistics takes
+    all of them back out.
+    """
+    changes = defaultdict(list)
+    for pipeline_id, form_id, data in Response.objects.filter(
+        pipeline_submission__in=submissions
+    ).values_list("pipeline_id", "form_id", "data"):
+        changes[pipeline_id].append((form_id, data, 1))
+    for pipeline_id, pipeline_changes in changes.items():
+        apply_changes(pipeline_id, pipeline_changes)
+
+
+def record_response_change(response: Response, old_data: dict) -> None:
+    if response.pipeline_submission.is_completed:
+        apply_changes(
+            response.pipeline_id,
+            [(response.form_id, old_data, -1), (response.form_id, response.data, 1)],
+        )
+
+
+def forget_response(response: Response) -> None:
+    if PipelineSubmission.objects.filter(
+        id=response.pipeline_submission_id, is_completed=True
+    ).exists():
+        apply_changes(response.pipeline_id, [(response.form_id, response.data, -1)])
+
+
+def get_pipeline_statistics(pipeline_id: int) -> dict:
+    return {
+        (statistic.form_id, statistic.field_id): statistic
+        for statistic in FieldStatistic.objects.filter(pipeline_id=pipeline_id)
+    }
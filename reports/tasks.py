@@ -1,7 +1,19 @@
+import tempfile
+
 from celery import shared_task
 from celery.utils.log import get_task_logger
+from django.core.cache import cache
+from django.core.files import File
+from django.utils import timezone
+
+from forms.models import Pipeline
+from responses.models import PipelineSubmission
+from responses.utils import with_answered_responses
 
-from .models import Subscriber
+from .broadcast import get_dirty_key, has_listeners, publish_report
+from .engine import create_new_report
+from .exports import write_parquet
+from .models import ResponseExport, Subscriber
 from .serializers import ResponseReportSerializer
 from .utils import send_email
 
@@ -10,9 +22,44 @@ logger = get_task_logger(__name__)
 
 @shared_task
 def send_reports_to_subscriber():
+    since = timezone.now() - timezone.timedelta(days=30)
     for subscriber in Subscriber.objects.select_related("user", "pipeline").all():
+        submissions = with_answered_responses(
+            PipelineSubmission.objects.select_related("owner").filter(
+                pipeline__id=subscriber.pipeline.id, updated_at__gte=since
+            )
+        )
         send_email(
             subject=f"Your monthly repost of {subscriber.pipeline.title}",
-            message=str(ResponseReportSerializer(instance=subscriber.pipeline).data),
+            message=str(ResponseReportSerializer(instance=submissions, many=True).data),
             receiver=subscriber.user.email,
         )
+
+
+@shared_task
+def broadcast_pipeline_report(pipeline_id: int):
+    # changes committed from now on schedule the next broadcast
+    cache.delete(get_dirty_key(pipeline_id))
+    if not has_listeners(pipeline_id):
+        return
+    pipeline = Pipeline.objects.select_related("owner").filter(pk=pipeline_id).first()
+    if pipeline is None:
+        return
+    publish_report(pipeline, create_new_report(pipeline))
+
+
+@shared_task
+def build_response_export(export_id):
+    export = ResponseExport.objects.select_related("pipeline").get(pk=export_id)
+    try:
+        with tempfile.TemporaryFile() as file:
+            export.rows = write_parquet(export.pipeline, file)
+            file.seek(0)
+            export.file.save(f"{export.id}.parquet", File(file), save=False)
+    except Exception:
+        logger.exception(f"response export {export.id} failed")
+        export.status = ResponseExport.STATUSES.FAILED
+    else:
+        export.status = ResponseExport.STATUSES.DONE
+    export.finished_at = timezone.now()
+    export.save()
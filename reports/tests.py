@@ -0,0 +1,161 @@
+import csv
+import json
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from testing import TEST_CACHES, create_pipeline, create_user, submit
+
+from .consumers import FormReportConsumer
+from .engine import create_new_report
+from .exports import iter_csv, iter_ndjson
+from .state import advance_report_state
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CreateNewReportTests(TestCase):
+    def setUp(self):
+        self.owner = create_user(1)
+
+    def test_aggregates_answers_without_stored_statistics(self):
+        pipeline = create_pipeline(self.owner, 1)
+        submit(pipeline, "a", {"age": 20, "color": ["1"]})
+        submit(pipeline, "b", {"age": 40, "color": ["1", "10"]})
+
+        report = create_new_report(pipeline)
+
+        self.assertEqual(report["complete_responses"], 2)
+        self.assertEqual(
+            report["responses"]["form 0"],
+            {
+                "age": {
+                    "average": 30.0,
+                    "standard_deviation": 10.0,
+                    "maximum_value": 40.0,
+                    "minimum_value": 20.0,
+                },
+                "color": {"red": "100.0%", "blue": "50.0%"},
+            },
+        )
+
+    def test_one_query_per_form(self):
+        # the header, the stored statistics and the forms with their
+        # fields, then one aggregate per form
+        for number_of_forms in (1, 4):
+            with self.subTest(number_of_forms=number_of_forms):
+                pipeline = create_pipeline(self.owner, number_of_forms)
+                for index in range(3):
+                    submit(pipeline, f"{number_of_forms}-{index}", {"age": index})
+
+                with self.assertNumQueries(4 + number_of_forms):
+                    create_new_report(pipeline)
+
+
+@override_settings(
+    CACHES=TEST_CACHES,
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"],
+)
+class PeriodicReportApiTests(TestCase):
+    def setUp(self):
+        self.owner = create_user(1)
+        self.pipeline = create_pipeline(self.owner, 3)
+        # owned submissions, so that a query per owner would show
+        for index in range(20):
+            submit(
+                self.pipeline,
+                None,
+                {"age": index, "color": ["1"]},
+                owner=create_user(10 + index),
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+        self.url = reverse(
+            "api:reports:periodic-report", kwargs={"pipeline_id": self.pipeline.id}
+        )
+
+    def count_queries(self, params: dict) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), params["limit"])
+        return len(context.captured_queries)
+
+    def test_page_size_does_not_change_queries(self):
+        self.assertEqual(
+            self.count_queries({"limit": 2}), self.count_queries({"limit": 20})
+        )
+
+    def test_cursor_page_size_does_not_change_queries(self):
+        self.assertEqual(
+            self.count_queries({"cursor": "", "limit": 2}),
+            self.count_queries({"cursor": "", "limit": 20}),
+        )
+
+
+@override_settings(CACHES=TEST_CACHES)
+class CsvExportTests(TestCase):
+    def setUp(self):
+        self.pipeline = create_pipeline(create_user(1), 1)
+
+    def test_formula_cells_are_quoted(self):
+        submit(self.pipeline, "=1+1", {"age": "@SUM(A1)", "color": ["1"]})
+        submit(self.pipeline, "\tcmd", {"age": -3, "color": "-2+3"})
+
+        lines = "".join(iter_csv(self.pipeline)).splitlines()
+        rows = [(row[2], row[6], row[7]) for row in csv.reader(lines[1:])]
+
+        self.assertEqual(
+            rows, [("'=1+1", "'@SUM(A1)", '["1"]'), ("'\tcmd", "-3", "'-2+3")]
+        )
+
+    def test_ndjson_values_are_kept(self):
+        submit(self.pipeline, "=1+1", {"age": 30, "color": "-2"})
+
+        self.assertIn('"session_key": "=1+1"', "".join(iter_ndjson(self.pipeline)))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class FormReportConsumerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.consumer = FormReportConsumer()
+        self.consumer.pipeline_id = 1
+        self.sent = []
+
+        async def send(text_data):
+            self.sent.append(json.loads(text_data))
+
+        self.consumer.send = send
+
+    def deliver(self, seq: int, patch: list):
+        async_to_sync(self.consumer.report_delta)(
+            {"type": "report_delta", "seq": seq, "patch": patch}
+        )
+
+    def test_delta_after_a_gap_sends_the_missed_ones_first(self):
+        state, _ = advance_report_state(1, {"count": 0})
+        self.consumer.seq = state["seq"]
+        first, first_patch = advance_report_state(1, {"count": 1})
+        second, second_patch = advance_report_state(1, {"count": 2})
+
+        self.deliver(second["seq"], second_patch)
+        self.deliver(first["seq"], first_patch)
+
+        self.assertEqual(
+            [message["seq"] for message in self.sent], [first["seq"], second["seq"]]
+        )
+        self.assertEqual(self.consumer.seq, second["seq"])
+
+    def test_gap_older_than_the_history_sends_a_snapshot(self):
+        self.consumer.seq = 1
+        state, patch = advance_report_state(1, {"count": 1})
+
+        self.deliver(state["seq"], patch)
+
+        self.assertEqual(self.sent[0]["type"], "snapshot")
+        self.assertEqual(self.sent[0]["report"], {"count": 1})
@@ -1,6 +1,13 @@
 from django.urls import path
 
-from .apis import PeriodicReportApi, SubsrcribeReportApi
+from .apis import (
+    PeriodicReportApi,
+    PipelineExportApi,
+    ResponseExportApi,
+    ResponseExportDownloadApi,
+    ResponseExportRetrieveApi,
+    SubsrcribeReportApi,
+)
 
 app_name = "reports"
 
@@ -15,4 +22,24 @@ urlpatterns = [
         SubsrcribeReportApi.as_view(),
         name="subscribe-for-report",
     ),
+    path(
+        "export/<int:pipeline_id>/",
+        PipelineExportApi.as_view(),
+        name="export-responses",
+    ),
+    path(
+        "exports/<int:pipeline_id>/",
+        ResponseExportApi.as_view(),
+        name="create-response-export",
+    ),
+    path(
+        "exports/<uuid:export_id>/",
+        ResponseExportRetrieveApi.as_view(),
+        name="response-export",
+    ),
+    path(
+        "exports/<uuid:export_id>/download/",
+        ResponseExportDownloadApi.as_view(),
+        name="download-response-export",
+    ),
 ]
@@ -1,32 +1,80 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_cookie
+from django.views.decorators.vary import vary_on_cookie, vary_on_headers
+from rest_framework import status
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import PipelineSubmission
+from .idempotency import idempotent
+from .models import PipelineSubmission, ResponseIngestion
 from .models import Response as ResponseModel
+from .respondents import RESPONDENT_TOKEN_HEADER, get_session_key
 from .serializer import (
     PipelineSubmissionSerializer,
+    ResponseBatchWriteSerializer,
+    ResponseIngestionSerializer,
     ResponseUpdateSerializer,
     ResponseWriteSerializer,
 )
+from .utils import with_answered_responses
+
+
+def enqueued_response(serializer):
+    ingestion = serializer.enqueue()
+    return Response(
+        data=ResponseIngestionSerializer(instance=ingestion).data,
+        status=status.HTTP_202_ACCEPTED,
+    )
 
 
 class AddResponseView(APIView):
 
+    @idempotent
     def post(self, request):
         serializer = ResponseWriteSerializer(
             data=request.data, context={"request": request}
         )
         serializer.is_valid(raise_exception=True)
+        if settings.RESPONSE_INGESTION_QUEUE:
+            return enqueued_response(serializer)
+        serializer.save()
+        return Response(data=serializer.data)
+
+
+class AddResponsesView(APIView):
+    """
+    Answer several forms of a pipeline at once.
+    """
+
+    @idempotent
+    def post(self, request):
+        serializer = ResponseBatchWriteSerializer(
+            data=request.data, context={"request": request}
+        )
+        serializer.is_valid(raise_exception=True)
+        if settings.RESPONSE_INGESTION_QUEUE:
+            return enqueued_response(serializer)
         serializer.save()
         return Response(data=serializer.data)
 
 
+class ResponseIngestionView(RetrieveAPIView):
+    """
+    Status of a queued submission. The receipt is only known to the respondent
+    who got it.
+    """
+
+    lookup_field = "pk"
+    lookup_url_kwarg = "receipt"
+    serializer_class = ResponseIngestionSerializer
+    queryset = ResponseIngestion.objects.all()
+
+
 class UpdateResponseView(APIView):
+    @idempotent
     def patch(self, request, response_id):
         response = get_object_or_404(ResponseModel, id=response_id)
         serializer = ResponseUpdateSerializer(
@@ -46,18 +94,16 @@ class ResponseRetrieveApi(RetrieveAPIView):
     serializer_class = PipelineSubmissionSerializer
 
     def get_queryset(self):
+        submissions = with_answered_responses(PipelineSubmission.objects.all())
         if self.request.user.is_authenticated:
             if self.request.user.is_admin:
-                return PipelineSubmission.objects.all()
-            return PipelineSubmission.objects.filter(owner__id=self.request.user.id)
+                return submissions
+            return submissions.filter(owner__id=self.request.user.id)
 
-        if self.request.session.session_key is None:
-            self.request.session.creat()
-        return PipelineSubmission.objects.filter(
-            session_key=self.request.session.session_key
-        )
+        return submissions.filter(session_key=get_session_key(self.request))
 
     @method_decorator(cache_page(60 * 60 * 2))
     @method_decorator(vary_on_cookie)
+    @method_decorator(vary_on_headers(RESPONDENT_TOKEN_HEADER))
     def get(self, *args, **kwargs):
         return super().get(*args, **kwargs)
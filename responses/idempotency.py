@@ -0,0 +1,117 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+from .respondents import get_existing_session_key
+
+
+def get_idempotency_key(request, key: str) -> str | None:
+    # scoped to the respondent, so nobody can replay the response of another.
+    # An anonymous request without a session or token has no scope yet.
+    if request.user.is_authenticated:
+        respondent = f"user_{request.user.id}"
+    else:
+        session_key = get_existing_session_key(request)
+        if session_key is None:
+            return None
+        respondent = f"session_{session_key}"
+    return f"idempotency_{request.method}_{request.path}_{respondent}_{key}"
+
+
+def get_request_fingerprint(request) -> str:
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def wait_for_response(cache_key: str, lock_key: str) -> dict | None:
+    for _ in range(int(settings.IDEMPOTENCY_LOCK_TIMEOUT * 10)):
+        time.sleep(0.1)
+        stored = cache.get(cache_key)
+        if stored is not None or cache.get(lock_key) is None:
+            return stored
+    return None
+
+
+def replay(stored: dict, fingerprint: str) -> Response:
+    if stored["fingerprint"] != fingerprint:
+        return Response(
+            data={
+                "message": "This Idempotency-Key was used for a different request."
+            },
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(
+        data=stored["data"],
+        status=stored["status"],
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def idempotent(method):
+    """
+    Make a view method safe to retry with an ``Idempotency-Key`` header.
+
+    The status and body of the first request with a key are kept for
+    ``IDEMPOTENCY_TTL`` seconds and replayed to its retries without running
+    the view again. Retries that arrive while the first request is still
+    running wait for it on a cache lock. A key reused with a different body
+    gets a 422 instead of a replay. Keys of anonymous respondents are only
+    kept once they have a session or respondent token.
+    """
+
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            return method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            raise ValidationError(
+                {"Idempotency-Key": "It should be at most 255 characters."}
+            )
+
+        cache_key = get_idempotency_key(request, key)
+        if cache_key is None:
+            return method(self, request, *args, **kwargs)
+        fingerprint = get_request_fingerprint(request)
+        lock_key = f"{cache_key}_lock"
+        stored = cache.get(cache_key)
+        if stored is not None:
+            return replay(stored, fingerprint)
+
+        if not cache.add(lock_key, 1, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            stored = wait_for_response(cache_key, lock_key)
+            if stored is None:
+                return Response(
+                    data={
+                        "message": "A request with this Idempotency-Key is in progress."
+                    },
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return replay(stored, fingerprint)
+
+        try:
+            try:
+                response = method(self, request, *args, **kwargs)
+            except APIException as exc:
+                response = self.handle_exception(exc)
+            # server errors are worth retrying
+            if response.status_code < 500:
+                cache.set(
+                    cache_key,
+                    {
+                        "fingerprint": fingerprint,
+                        "status": response.status_code,
+                        "data": response.data,
+                    },
+                    timeout=settings.IDEMPOTENCY_TTL,
+                )
+            return response
+        finally:
+            cache.delete(lock_key)
+
+    return wrapper
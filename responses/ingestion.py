@@ -0,0 +1,208 @@
+import logging
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from core.celery import schedule_once
+from forms.models import Form, Pipeline
+from reports.broadcast import mark_report_dirty
+from reports.statistics import record_submissions
+
+from .models import Answer, PipelineSubmission, Response, ResponseIngestion
+from .utils import build_answers, build_responses, get_respondent_lookup
+
+DRAIN_KEY = "response_ingestion_drain"
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_responses(
+    pipeline: Pipeline, answers: list[tuple[Form, dict]], user, session_key: str
+) -> ResponseIngestion:
+    """
+    Store validated answers for ``drain_response_ingestions`` with a single
+    insert, and return the ingestion whose id is the receipt.
+    """
+    ingestion = ResponseIngestion.objects.create(
+        pipeline=pipeline,
+        answers=[{"form": form.id, "data": data} for form, data in answers],
+        **get_respondent_lookup(user, session_key),
+    )
+    transaction.on_commit(schedule_ingestion_drain)
+    return ingestion
+
+
+def schedule_ingestion_drain() -> None:
+    """
+    Drain the queue ``RESPONSE_INGESTION_WINDOW`` seconds from now, unless a
+    drain is already pending.
+    """
+    from .tasks import drain_response_ingestions
+
+    schedule_once(
+        DRAIN_KEY, drain_response_ingestions, settings.RESPONSE_INGESTION_WINDOW
+    )
+
+
+def get_respondent_key(pipeline_id: int, owner_id, session_key) -> tuple:
+    return (pipeline_id, owner_id, session_key if owner_id is None else None)
+
+
+def drain_ingestions(batch_size: int = 500) -> int:
+    """
+    Write pending ingestions, oldest first, and return how many were handled.
+    """
+    drained = 0
+    while True:
+        count = drain_batch(batch_size)
+        drained += count
+        if count < batch_size:
+            return drained
+
+
+def drain_batch(batch_size: int) -> int:
+    """
+    Write a batch of pending ingestions in one transaction: one insert of
+    the missing submissions, one lock of all of them, one insert each of all
+    responses and their typed answers and one update each of the
+    submissions and the ingestions.
+
+    Rows locked by another worker are skipped, so workers can drain in
+    parallel.
+    """
+    with transaction.atomic():
+        ingestions = list(
+            ResponseIngestion.objects.select_for_update(skip_locked=True)
+            .filter(status=ResponseIngestion.STATUSES.PENDING)
+            .order_by("created_at")[:batch_size]
+        )
+        if not ingestions:
+            return 0
+        pipelines = Pipeline.objects.in_bulk(
+            {ingestion.pipeline_id for ingestion in ingestions}
+        )
+        forms = Form.objects.in_bulk(
+            {answer["form"] for ingestion in ingestions for answer in ingestion.answers}
+        )
+        keys = {
+            get_respondent_key(
+                ingestion.pipeline_id, ingestion.owner_id, ingestion.session_key
+            )
+            for ingestion in ingestions
+        }
+        PipelineSubmission.objects.bulk_create(
+            [
+                PipelineSubmission(
+                    pipeline_id=pipeline_id, owner_id=owner_id, session_key=session_key
+                )
+                for pipeline_id, owner_id, session_key in keys
+            ],
+            ignore_conflicts=True,
+        )
+        submissions = {
+            get_respondent_key(
+                submission.pipeline_id, submission.owner_id, submission.session_key
+            ): submission
+            for submission in PipelineSubmission.objects.select_for_update().filter(
+                reduce(
+                    or_,
+                    [
+                        Q(pipeline_id=pipeline_id, owner_id=owner_id)
+                        if owner_id is not None
+                        else Q(pipeline_id=pipeline_id, session_key=session_key)
+                        for pipeline_id, owner_id, session_key in keys
+                    ],
+                )
+            )
+        }
+
+        now = timezone.now()
+        responses = []
+        written = {}
+        changed = {}
+        completed = {}
+        for ingestion in ingestions:
+            ingestion.processed_at = now
+            key = get_respondent_key(
+                ingestion.pipeline_id, ingestion.owner_id, ingestion.session_key
+            )
+            submission = submissions[key]
+            submission.pipeline = pipelines[ingestion.pipeline_id]
+            was_completed = submission.is_completed
+            try:
+                answers = []
+                for answer in ingestion.answers:
+                    form = forms.get(answer["form"])
+                    # the form may have left the pipeline since it was queued
+                    if (
+                        form is None
+                        or form.id not in submission.pipeline.metadata["order"]
+                    ):
+                        raise serializers.ValidationError(
+                            {"error": "This form not belong to this pipeline"}
+                        )
+                    answers.append((form, answer["data"]))
+                lookup = (
+                    {"owner_id": ingestion.owner_id}
+                    if ingestion.owner_id is not None
+                    else {"session_key": ingestion.session_key}
+                )
+                new_responses = build_responses(
+                    submission,
+                    answers,
+                    lookup,
+                    submitted_at=ingestion.created_at,
+                )
+            except serializers.ValidationError as error:
+                ingestion.status = ResponseIngestion.STATUSES.FAILED
+                ingestion.result = {"errors": error.detail}
+                continue
+            except DatabaseError:
+                # the transaction is aborted, so the whole batch is left to
+                # the next drain
+                raise
+            except Exception:
+                # one broken ingestion must not hold back the rest of the batch
+                logger.exception(f"response ingestion {ingestion.id} failed")
+                ingestion.status = ResponseIngestion.STATUSES.FAILED
+                ingestion.result = {
+                    "errors": {"message": "Your responses could not be saved."}
+                }
+                continue
+            ingestion.status = ResponseIngestion.STATUSES.DONE
+            written[ingestion.id] = new_responses
+            responses += new_responses
+            submission.updated_at = now
+            changed[submission.id] = submission
+            if submission.is_completed and not was_completed:
+                completed[submission.id] = submission
+
+        Response.objects.bulk_create(responses, batch_size=1000)
+        Answer.objects.bulk_create(build_answers(responses), batch_size=1000)
+        PipelineSubmission.objects.bulk_update(
+            changed.values(),
+            [
+                "answered_count",
+                "answered_mask",
+                "next_position",
+                "is_completed",
+                "updated_at",
+            ],
+        )
+        record_submissions(list(completed.values()))
+        for ingestion in ingestions:
+            if ingestion.id in written:
+                ingestion.result = {
+                    "responses": [response.id for response in written[ingestion.id]]
+                }
+        ResponseIngestion.objects.bulk_update(
+            ingestions, ["status", "result", "processed_at"]
+        )
+        for pipeline_id in {submission.pipeline_id for submission in changed.values()}:
+            transaction.on_commit(lambda id=pipeline_id: mark_report_dirty(id))
+    return len(ingestions)
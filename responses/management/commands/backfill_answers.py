@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from responses.models import Answer, Response
+from responses.utils import build_answers
+
+
+class Command(BaseCommand):
+    help = "Write the typed answers of responses from their JSON data."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pipeline",
+            type=int,
+            action="append",
+            dest="pipelines",
+            help="Only backfill the given pipeline id (can be repeated).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of responses written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        responses = Response.objects.select_related("form").order_by("id")
+        if options["pipelines"]:
+            responses = responses.filter(pipeline_id__in=options["pipelines"])
+
+        last_id = 0
+        total = 0
+        while True:
+            batch = list(responses.filter(id__gt=last_id)[: options["batch_size"]])
+            if not batch:
+                break
+            with transaction.atomic():
+                # rewriting makes the command safe to run again
+                Answer.objects.filter(response__in=batch).delete()
+                answers = Answer.objects.bulk_create(build_answers(batch))
+            last_id = batch[-1].id
+            total += len(batch)
+            self.stdout.write(f"{total} responses backfilled, {len(answers)} answers")
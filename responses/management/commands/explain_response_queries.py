@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from forms.models import Pipeline
+from responses.models import PipelineSubmission, Response
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plans of the hot response and submission lookups of "
+        "a pipeline, e.g. to compare them before and after an index change."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("pipeline", type=int, help="Pipeline id to explain.")
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Run the queries and show real timings (PostgreSQL only).",
+        )
+
+    def handle(self, *args, **options):
+        pipeline = Pipeline.objects.get(pk=options["pipeline"])
+        submission = PipelineSubmission.objects.filter(pipeline=pipeline).first()
+        form_id = pipeline.metadata["order"][0] if pipeline.metadata["order"] else 0
+        queries = {
+            "submission of a session": PipelineSubmission.objects.filter(
+                pipeline=pipeline,
+                session_key=submission.session_key if submission else "",
+            ),
+            "submission of a user": PipelineSubmission.objects.filter(
+                pipeline=pipeline, owner_id=submission.owner_id if submission else 0
+            ),
+            "completed submissions": PipelineSubmission.objects.filter(
+                pipeline=pipeline, is_completed=True
+            ),
+            "report header": PipelineSubmission.objects.filter(
+                pipeline=pipeline
+            ).values("pipeline").annotate(
+                total=Count("id"), complete=Count("id", filter=Q(is_completed=True))
+            ),
+            "completed responses of a form": Response.objects.filter(
+                pipeline=pipeline,
+                form_id=form_id,
+                pipeline_submission__is_completed=True,
+            ),
+            "periodic report": PipelineSubmission.objects.filter(
+                pipeline__owner_id=pipeline.owner_id,
+                updated_at__gte=timezone.now() - timedelta(days=30),
+            ),
+        }
+        explain_options = {"analyze": True} if options["analyze"] else {}
+        for name, queryset in queries.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queryset.explain(**explain_options))
@@ -0,0 +1,28 @@
+from django.conf import settings
+
+from .respondents import RESPONDENT_TOKEN_HEADER
+
+
+class RespondentTokenMiddleware:
+    """
+    Send a respondent token issued during the request back as a cookie and as
+    the ``X-Respondent-Token`` header, for clients without cookies.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        token = getattr(request, "respondent_token", None)
+        if token is not None:
+            response.set_cookie(
+                settings.RESPONDENT_TOKEN_COOKIE,
+                token,
+                max_age=settings.RESPONDENT_TOKEN_MAX_AGE,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+            response[RESPONDENT_TOKEN_HEADER] = token
+        return response
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.7 on 2026-10-18 11:54
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_submissions(apps, schema_editor):
+    """
+    Merge the submissions a respondent got twice from concurrent first
+    answers into the oldest one, and keep the first response of each form
+    of a submission, so that the unique constraints can be added.
+    """
+    PipelineSubmission = apps.get_model("responses", "PipelineSubmission")
+    Response = apps.get_model("responses", "Response")
+
+    merged = set()
+    for lookup in ("owner", "session_key"):
+        duplicates = (
+            PipelineSubmission.objects.filter(**{f"{lookup}__isnull": False})
+            .values("pipeline_id", lookup)
+            .annotate(count=Count("id"), kept_id=Min("id"))
+            .filter(count__gt=1)
+        )
+        for row in duplicates:
+            submissions = PipelineSubmission.objects.filter(
+                pipeline_id=row["pipeline_id"], **{lookup: row[lookup]}
+            ).exclude(id=row["kept_id"])
+            Response.objects.filter(pipeline_submission__in=submissions).update(
+                pipeline_submission_id=row["kept_id"]
+            )
+            if submissions.filter(is_completed=True).exists():
+                PipelineSubmission.objects.filter(id=row["kept_id"]).update(
+                    is_completed=True
+                )
+            submissions.delete()
+            merged.add(row["kept_id"])
+
+    for row in (
+        Response.objects.values("pipeline_submission_id", "form_id")
+        .annotate(count=Count("id"), kept_id=Min("id"))
+        .filter(count__gt=1)
+    ):
+        Response.objects.filter(
+            pipeline_submission_id=row["pipeline_submission_id"],
+            form_id=row["form_id"],
+        ).exclude(id=row["kept_id"]).delete()
+        merged.add(row["pipeline_submission_id"])
+
+    # the answered forms of a merged submission are those it now has
+    for submission in PipelineSubmission.objects.filter(id__in=merged):
+        submission.responses = {
+            "responsed_forms": list(
+                Response.objects.filter(pipeline_submission=submission)
+                .order_by("id")
+                .values_list("form_id", flat=True)
+            )
+        }
+        submission.save(update_fields=["responses"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0010_backfill_pipelineform'),
+        ('responses', '0009_alter_response_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_submissions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='pipelinesubmission',
+            constraint=models.UniqueConstraint(condition=models.Q(('owner__isnull', False)), fields=('pipeline', 'owner'), name='pipeline_submission_owner_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='pipelinesubmission',
+            constraint=models.UniqueConstraint(condition=models.Q(('session_key__isnull', False)), fields=('pipeline', 'session_key'), name='pipeline_submission_session_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='response',
+            constraint=models.UniqueConstraint(fields=('pipeline_submission', 'form'), name='response_submission_form_uniq'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.0.7 on 2026-10-18 11:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class AddIndexConcurrently(migrations.AddIndex):
+    """
+    AddIndex that builds the index without blocking writes on PostgreSQL.
+    Other databases get a plain CREATE INDEX.
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_forwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.add_index(model, self.index, concurrently=True)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor != "postgresql":
+            return super().database_backwards(
+                app_label, schema_editor, from_state, to_state
+            )
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            schema_editor.remove_index(model, self.index, concurrently=True)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('forms', '0010_backfill_pipelineform'),
+        ('responses', '0011_responseingestion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='pipelinesubmission',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['pipeline'], name='pipeline_submission_done_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='pipelinesubmission',
+            index=models.Index(fields=['pipeline', 'updated_at'], name='pipeline_submission_upd_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='response',
+            index=models.Index(fields=['pipeline', 'form'], name='response_pipeline_form_idx'),
+        ),
+    ]
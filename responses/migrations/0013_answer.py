@@ -0,0 +1,29 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('forms', '0010_backfill_pipelineform'),
+        ('responses', '0012_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Answer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numeric_value', models.FloatField(blank=True, null=True)),
+                ('text_value', models.TextField(blank=True, null=True)),
+                ('choice', models.CharField(blank=True, max_length=64, null=True)),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='forms.field')),
+                ('response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='responses.response')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('numeric_value__isnull', False)), fields=['field', 'numeric_value'], name='answer_field_numeric_idx'), models.Index(condition=models.Q(('choice__isnull', False)), fields=['field', 'choice'], name='answer_field_choice_idx')],
+            },
+        ),
+    ]
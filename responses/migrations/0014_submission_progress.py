@@ -0,0 +1,82 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:02
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def count_answered_forms(apps, schema_editor):
+    PipelineSubmission = apps.get_model("responses", "PipelineSubmission")
+
+    submissions = []
+    for submission in (
+        PipelineSubmission.objects.select_related("pipeline")
+        .only("id", "responses", "pipeline__metadata")
+        .iterator(chunk_size=BATCH_SIZE)
+    ):
+        form_ids = set(submission.responses.get("responsed_forms", []))
+        next_position = 0
+        for form_id in submission.pipeline.metadata.get("order", []):
+            if form_id not in form_ids:
+                break
+            next_position += 1
+        submission.answered_count = len(form_ids)
+        submission.next_position = next_position
+        submissions.append(submission)
+        if len(submissions) == BATCH_SIZE:
+            PipelineSubmission.objects.bulk_update(
+                submissions, ["answered_count", "next_position"]
+            )
+            submissions = []
+    PipelineSubmission.objects.bulk_update(
+        submissions, ["answered_count", "next_position"]
+    )
+
+
+def list_answered_forms(apps, schema_editor):
+    PipelineSubmission = apps.get_model("responses", "PipelineSubmission")
+    Response = apps.get_model("responses", "Response")
+
+    # responses of a submission are read together, so a batch is written
+    # once its last submission is complete
+    submissions = []
+    for submission_id, form_id in (
+        Response.objects.order_by("pipeline_submission_id", "id")
+        .values_list("pipeline_submission_id", "form_id")
+        .iterator(chunk_size=BATCH_SIZE)
+    ):
+        if not submissions or submissions[-1].id != submission_id:
+            if len(submissions) == BATCH_SIZE:
+                PipelineSubmission.objects.bulk_update(submissions, ["responses"])
+                submissions = []
+            submissions.append(
+                PipelineSubmission(id=submission_id, responses={"responsed_forms": []})
+            )
+        submissions[-1].responses["responsed_forms"].append(form_id)
+    PipelineSubmission.objects.bulk_update(submissions, ["responses"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('responses', '0013_answer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipelinesubmission',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pipelinesubmission',
+            name='next_position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_answered_forms, list_answered_forms),
+        migrations.RemoveField(
+            model_name='pipelinesubmission',
+            name='responses',
+        ),
+    ]
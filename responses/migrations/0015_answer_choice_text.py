@@ -0,0 +1,18 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('responses', '0014_submission_progress'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='answer',
+            name='choice',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
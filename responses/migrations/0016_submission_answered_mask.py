@@ -0,0 +1,52 @@
+# Generated by Django 5.0.7 on 2026-10-18 12:48
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_answered_masks(apps, schema_editor):
+    PipelineSubmission = apps.get_model("responses", "PipelineSubmission")
+    Response = apps.get_model("responses", "Response")
+
+    submissions = (
+        PipelineSubmission.objects.select_related("pipeline")
+        .only("id", "pipeline__metadata")
+        .order_by("id")
+    )
+    last_id = 0
+    while batch := list(submissions.filter(id__gt=last_id)[:BATCH_SIZE]):
+        last_id = batch[-1].id
+        answered = defaultdict(set)
+        for submission_id, form_id in Response.objects.filter(
+            pipeline_submission__in=batch
+        ).values_list("pipeline_submission_id", "form_id"):
+            answered[submission_id].add(form_id)
+        for submission in batch:
+            mask = 0
+            order = submission.pipeline.metadata.get("order", [])
+            for position, form_id in enumerate(order):
+                if form_id in answered[submission.id]:
+                    mask |= 1 << position
+            submission.answered_mask = mask.to_bytes(
+                (mask.bit_length() + 7) // 8, "big"
+            )
+        PipelineSubmission.objects.bulk_update(batch, ["answered_mask"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('responses', '0015_answer_choice_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pipelinesubmission',
+            name='answered_mask',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(fill_answered_masks, migrations.RunPython.noop),
+    ]
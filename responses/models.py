@@ -1,8 +1,10 @@
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.contrib.sessions.models import Session
 from django.db import models
 
-from forms.models import Form, Pipeline
+from forms.models import Field, Form, Pipeline
 
 
 class Response(models.Model):
@@ -30,8 +32,50 @@ class Response(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["pipeline_submission", "form"],
+                name="response_submission_form_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["pipeline", "form"], name="response_pipeline_form_idx"),
+        ]
+
+
+class Answer(models.Model):
+    """
+    Typed copy of one answer of a response, for analytics that can use
+    indexes instead of parsing ``Response.data``. A choice answer has a row
+    per selected choice.
+    """
+
+    response = models.ForeignKey(
+        to=Response, on_delete=models.CASCADE, related_name="answers"
+    )
+    field = models.ForeignKey(to=Field, on_delete=models.CASCADE, related_name="+")
+    numeric_value = models.FloatField(null=True, blank=True)
+    text_value = models.TextField(null=True, blank=True)
+    choice = models.TextField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["field", "numeric_value"],
+                condition=models.Q(numeric_value__isnull=False),
+                name="answer_field_numeric_idx",
+            ),
+            models.Index(
+                fields=["field", "choice"],
+                condition=models.Q(choice__isnull=False),
+                name="answer_field_choice_idx",
+            ),
+        ]
+
 
 def get_default_responses():
+    # used by old migrations
     return {
         "responsed_forms": [],
     }
@@ -39,7 +83,12 @@ def get_default_responses():
 
 class PipelineSubmission(models.Model):
     pipeline = models.ForeignKey(to=Pipeline, on_delete=models.CASCADE)
-    responses = models.JSONField(default=get_default_responses)
+    # number of answered forms, bit i set once the form at position i of
+    # ``metadata["order"]`` is answered and, when forms are answered in
+    # order, the position of the next one
+    answered_count = models.PositiveIntegerField(default=0)
+    answered_mask = models.BinaryField(default=b"")
+    next_position = models.PositiveIntegerField(default=0)
     owner = models.ForeignKey(
         to=get_user_model(), on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -47,3 +96,69 @@ class PipelineSubmission(models.Model):
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    def get_answered_mask(self) -> int:
+        return int.from_bytes(bytes(self.answered_mask), "big")
+
+    def set_answered_mask(self, mask: int) -> None:
+        self.answered_mask = mask.to_bytes((mask.bit_length() + 7) // 8, "big")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["pipeline", "owner"],
+                condition=models.Q(owner__isnull=False),
+                name="pipeline_submission_owner_uniq",
+            ),
+            models.UniqueConstraint(
+                fields=["pipeline", "session_key"],
+                condition=models.Q(session_key__isnull=False),
+                name="pipeline_submission_session_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["pipeline"],
+                condition=models.Q(is_completed=True),
+                name="pipeline_submission_done_idx",
+            ),
+            models.Index(
+                fields=["pipeline", "updated_at"],
+                name="pipeline_submission_upd_idx",
+            ),
+        ]
+
+
+class ResponseIngestion(models.Model):
+    """
+    A validated submission waiting to be written by ``drain_response_ingestions``.
+    Its id is the receipt given to the respondent.
+    """
+
+    class STATUSES(models.IntegerChoices):
+        PENDING = 1, "pending"
+        DONE = 2, "done"
+        FAILED = 3, "failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    pipeline = models.ForeignKey(to=Pipeline, on_delete=models.CASCADE)
+    owner = models.ForeignKey(
+        to=get_user_model(), on_delete=models.SET_NULL, null=True, blank=True
+    )
+    session_key = models.CharField(max_length=40, null=True, blank=True)
+    answers = models.JSONField()
+    status = models.PositiveSmallIntegerField(
+        choices=STATUSES, default=STATUSES.PENDING
+    )
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(status=1),
+                name="response_ingestion_pending_idx",
+            ),
+        ]
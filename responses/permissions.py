@@ -1,9 +1,10 @@
 from rest_framework.permissions import BasePermission
 
+from .respondents import get_session_key
+
 
 class IsAdminOrOwnerResponse(BasePermission):
     def has_permission(self, request, view):
-        if request.session.session_key is None:
-            request.session.creat()
+        get_session_key(request)
 
         return super().has_permission(request, view)
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core import signing
+from django.utils.crypto import get_random_string
+
+RESPONDENT_TOKEN_HEADER = "X-Respondent-Token"
+KEY_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def get_signer() -> signing.TimestampSigner:
+    return signing.TimestampSigner(salt="responses.respondent")
+
+
+def get_session_key(request) -> str:
+    """
+    Return the key that owns the submissions and responses of an anonymous
+    respondent.
+
+    With ``RESPONDENT_IDENTITY = "session"`` it is the key of a database
+    session. With ``"token"`` it is read from a signed, expiring token in a
+    cookie or the ``X-Respondent-Token`` header, and a missing, tampered or
+    expired token gets a new key without touching the database.
+    ``RespondentTokenMiddleware`` sends new tokens back.
+    """
+    if settings.RESPONDENT_IDENTITY == "session":
+        if request.session.session_key is None:
+            request.session.create()
+        return request.session.session_key
+
+    # the django request behind a rest framework request
+    request = getattr(request, "_request", request)
+    if not hasattr(request, "respondent_key"):
+        token = request.headers.get(RESPONDENT_TOKEN_HEADER) or request.COOKIES.get(
+            settings.RESPONDENT_TOKEN_COOKIE, ""
+        )
+        try:
+            request.respondent_key = get_signer().unsign(
+                token, max_age=settings.RESPONDENT_TOKEN_MAX_AGE
+            )
+        except signing.BadSignature:
+            request.respondent_key = get_random_string(32, KEY_CHARS)
+            request.respondent_token = get_signer().sign(request.respondent_key)
+    return request.respondent_key
+
+
+def get_existing_session_key(request) -> str | None:
+    """
+    Return the key of an anonymous respondent if the request already carries
+    one, without creating a session or issuing a token.
+    """
+    if settings.RESPONDENT_IDENTITY == "session":
+        return request.session.session_key
+
+    key = get_session_key(request)
+    # a token issued by this request identifies nobody yet
+    if hasattr(getattr(request, "_request", request), "respondent_token"):
+        return None
+    return key
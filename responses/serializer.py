@@ -1,29 +1,19 @@
-import re
-
-from django.db.models import QuerySet
-from django.urls import reverse
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
-from forms.models import Field, Form, Pipeline
-
-from .models import PipelineSubmission, Response
-from .utils import get_client_ip
+from forms.access import has_access_grant
+from forms.models import Form, Pipeline
+from forms.validation import get_validation_plan
+from reports.statistics import record_response_change
 
+from .ingestion import enqueue_responses
+from .models import PipelineSubmission, Response, ResponseIngestion
+from .respondents import get_session_key
+from .utils import replace_answers, save_responses
 
-class ResponseWriteSerializer(serializers.ModelSerializer):
-    password = serializers.CharField(required=False)
-
-    class Meta:
-        model = Response
-        exclude = [
-            "created_at",
-            "updated_at",
-            "session_key",
-            "owner",
-            "pipeline_submission",
-        ]
 
+class PipelineAccessMixin:
     def validate_pipeline(self, pipeline: Pipeline):
         now = timezone.make_aware(
             timezone.datetime.now(), timezone.get_default_timezone()
@@ -38,13 +28,12 @@ class ResponseWriteSerializer(serializers.ModelSerializer):
             )
         return pipeline
 
-    def validate(self, attrs):
-        if self.context["request"].session.session_key is None:
-            self.context["request"].session.create()
-        session_key = self.context["request"].session.session_key
-
+    def check_access(self, attrs):
         pipeline: Pipeline = attrs["pipeline"]
-        if pipeline.is_private:
+        # a grant from the unlock endpoint saves hashing the password again
+        if pipeline.is_private and not has_access_grant(
+            self.context["request"], pipeline.id, pipeline.password
+        ):
             if "password" not in attrs:
                 raise serializers.ValidationError(
                     {
@@ -52,8 +41,7 @@ class ResponseWriteSerializer(serializers.ModelSerializer):
                     }
                 )
 
-            password = attrs["password"]
-            if password != pipeline.password:
+            if not pipeline.check_password(attrs["password"]):
                 raise serializers.ValidationError(
                     {"password": "password is incorrect."}
                 )
@@ -61,279 +49,122 @@ class ResponseWriteSerializer(serializers.ModelSerializer):
         if "password" in attrs:
             attrs.pop("password")
 
+    def get_answers(self, validated_data) -> list[tuple[Form, dict]]:
+        raise NotImplementedError
+
+    def enqueue(self) -> ResponseIngestion:
+        request = self.context["request"]
+        return enqueue_responses(
+            self.validated_data["pipeline"],
+            self.get_answers(self.validated_data),
+            request.user,
+            get_session_key(request),
+        )
+
+
+class ResponseWriteSerializer(PipelineAccessMixin, serializers.ModelSerializer):
+    password = serializers.CharField(required=False)
+
+    class Meta:
+        model = Response
+        exclude = [
+            "created_at",
+            "updated_at",
+            "session_key",
+            "owner",
+            "pipeline_submission",
+        ]
+
+    def validate(self, attrs):
+        self.check_access(attrs)
+        pipeline: Pipeline = attrs["pipeline"]
         form: Form = attrs["form"]
         if form.id not in pipeline.metadata["order"]:
             raise serializers.ValidationError(
                 {"error": "This form not belong to this pipeline"}
             )
-        if pipeline.hide_next_button:
-            index_form = pipeline.metadata["order"].index(form.id)
-
-            if self.context["request"].user.is_authenticated:
-                if index_form != 0:
-                    previous_form_id = pipeline.metadata["order"][index_form - 1]
-                    if not Response.objects.filter(
-                        form__id=previous_form_id,
-                        pipeline__id=pipeline.id,
-                        owner__id=self.context["request"].user.id,
-                    ).exists():
-                        raise serializers.ValidationError(
-                            f"You should first answer to previous form with id: {previous_form_id}"
-                        )
-            else:
-                if index_form != 0:
-                    previous_form_id = pipeline.metadata["order"][index_form - 1]
-                    if not Response.objects.filter(
-                        form__id=previous_form_id,
-                        pipeline__id=pipeline.id,
-                        session_key=session_key,
-                    ).exists():
-                        raise serializers.ValidationError(
-                            f"You should first answer to previous form with id: {previous_form_id}"
-                        )
-
-        fields: QuerySet[Field] = form.fields.all()
-        data = attrs["data"]
-        for field in fields:
-            if field.answer_required:
-                if field.slug not in data.keys():
-                    raise serializers.ValidationError(
-                        {
-                            "data": {field.slug: "This field is required."},
-                        }
-                    )
-            resp = data.get(field.slug, None)
-            if resp is not None:
-                ResponseWriteSerializer.field_validation(
-                    field=field,
-                    response=resp,
-                )
+        plan = get_validation_plan(form)
+        attrs["data"] = plan.clean(attrs["data"])
+        return attrs
 
-        keys_to_keep = [id[0] for id in fields.values_list("slug")]
-        filtered_dict = {
-            k: attrs["data"][k] for k in keys_to_keep if k in attrs["data"]
-        }
-        attrs["data"] = filtered_dict
+    def get_answers(self, validated_data) -> list[tuple[Form, dict]]:
+        return [(validated_data["form"], validated_data["data"])]
+
+    def create(self, validated_data):
+        request = self.context["request"]
+        (response,) = save_responses(
+            validated_data["pipeline"],
+            self.get_answers(validated_data),
+            request.user,
+            get_session_key(request),
+        )
+        return response
+
+
+class BatchAnswerSerializer(serializers.Serializer):
+    form = serializers.IntegerField()
+    data = serializers.JSONField()
+
+
+class ResponseBatchWriteSerializer(PipelineAccessMixin, serializers.Serializer):
+    pipeline = serializers.PrimaryKeyRelatedField(queryset=Pipeline.objects.all())
+    password = serializers.CharField(required=False)
+    responses = BatchAnswerSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        self.check_access(attrs)
+        pipeline: Pipeline = attrs["pipeline"]
+        # plans are cached, so the fields of the forms are rarely read
+        forms = Form.objects.in_bulk(pipeline.metadata["order"])
+
+        answers = []
+        errors = {}
+        seen = set()
+        for answer in attrs["responses"]:
+            form_id = answer["form"]
+            if form_id in seen:
+                errors[form_id] = {"error": "This form is answered more than once."}
+                continue
+            seen.add(form_id)
+            form = forms.get(form_id)
+            if form is None:
+                errors[form_id] = {"error": "This form not belong to this pipeline"}
+                continue
+            try:
+                answers.append((form, get_validation_plan(form).clean(answer["data"])))
+            except serializers.ValidationError as error:
+                errors[form_id] = error.detail
+        if errors:
+            raise serializers.ValidationError({"responses": errors})
+        attrs["responses"] = answers
         return attrs
 
+    def get_answers(self, validated_data) -> list[tuple[Form, dict]]:
+        return validated_data["responses"]
+
     def create(self, validated_data):
-        if self.context["request"].user.is_authenticated:
-            pipeline: Pipeline = validated_data["pipeline"]
-            form: Form = validated_data["form"]
-            if Response.objects.filter(
-                form__id=form.id,
-                pipeline__id=pipeline.id,
-                owner__id=self.context["request"].user.id,
-            ).exists():
-                response = Response.objects.only("id").get(
-                    form__id=form.id,
-                    pipeline__id=pipeline.id,
-                    owner__id=self.context["request"].user.id,
-                )
-                raise serializers.ValidationError(
-                    {
-                        "message": f"You responsed to this form befor, if you want to change your response, use url below",
-                        "url": f'{reverse("api:responses:update-response", kwargs={"response_id":response.id})}',
-                    }
-                )
+        request = self.context["request"]
+        return save_responses(
+            validated_data["pipeline"],
+            self.get_answers(validated_data),
+            request.user,
+            get_session_key(request),
+        )
 
-            pipeline_submission, created = PipelineSubmission.objects.get_or_create(
-                pipeline=pipeline, owner=self.context["request"].user
-            )
-            if created:
-                responsed_forms_list: list = pipeline_submission.responses[
-                    "responsed_forms"
-                ]
-                responsed_forms_list.append(form.id)
-                pipeline_submission.responses["responsed_forms"] = responsed_forms_list
-                pipeline_submission.save()
-            else:
-                now = timezone.make_aware(
-                    timezone.datetime.now(), timezone.get_default_timezone()
-                )
-                duration = (now - pipeline_submission.created_at).total_seconds() / 60
-                if pipeline.questions_responding_duration < duration:
-                    raise serializers.ValidationError(
-                        {"message": "Response time has expired."}
-                    )
-                responsed_forms_list: list = pipeline_submission.responses[
-                    "responsed_forms"
-                ]
-                responsed_forms_list.append(form.id)
-                pipeline_submission.responses["responsed_forms"] = responsed_forms_list
-                pipeline_submission.save()
-            if len(pipeline.metadata["order"]) == len(
-                pipeline_submission.responses["responsed_forms"]
-            ):
-                pipeline_submission.is_completed = True
-                pipeline_submission.save()
-            validated_data["owner"] = self.context["request"].user
-        else:
-            pipeline: Pipeline = validated_data["pipeline"]
-            form: Form = validated_data["form"]
-            if Response.objects.filter(
-                form__id=form.id,
-                pipeline__id=pipeline.id,
-                session_key=self.context["request"].session.session_key,
-            ).exists():
-                response = Response.objects.only("id").get(
-                    form__id=form.id,
-                    pipeline__id=pipeline.id,
-                    session_key=self.context["request"].session.session_key,
-                )
-                raise serializers.ValidationError(
-                    {
-                        "message": f"You responsed to this form befor, if you want to change your response, use url below",
-                        "url": f'{reverse("api:responses:update-response", kwargs={"response_id":response.id})}',
-                    }
-                )
+    def to_representation(self, instance: list[Response]):
+        return {
+            "pipeline": instance[0].pipeline_id,
+            "responses": ResponseWriteSerializer(instance=instance, many=True).data,
+        }
 
-            pipeline_submission, created = PipelineSubmission.objects.get_or_create(
-                pipeline=pipeline,
-                session_key=self.context["request"].session.session_key,
-            )
-            if created:
-                responsed_forms_list: list = pipeline_submission.responses[
-                    "responsed_forms"
-                ]
-                responsed_forms_list.append(form.id)
-                pipeline_submission.responses["responsed_forms"] = responsed_forms_list
-                pipeline_submission.save()
-            else:
-                now = timezone.make_aware(
-                    timezone.datetime.now(), timezone.get_default_timezone()
-                )
-                duration = (now - pipeline_submission.created_at).total_seconds() / 60
-                if pipeline.questions_responding_duration < duration:
-                    raise serializers.ValidationError(
-                        {"message": "Response time has expired."}
-                    )
-                responsed_forms_list: list = pipeline_submission.responses[
-                    "responsed_forms"
-                ]
-                responsed_forms_list.append(form.id)
-                pipeline_submission.responses["responsed_forms"] = responsed_forms_list
-                pipeline_submission.save()
-            if len(pipeline.metadata["order"]) == len(
-                pipeline_submission.responses["responsed_forms"]
-            ):
-                pipeline_submission.is_completed = True
-                pipeline_submission.save()
-            validated_data["session_key"] = self.context["request"].session.session_key
-        validated_data["pipeline_submission"] = pipeline_submission
-        return super().create(validated_data)
-
-    @staticmethod
-    def field_validation(field: Field, response):
-        match field.type:
-            case Field.TYPES.CHOISES_INPUT:
-                minimum = field.metadata["min_selectable_choices"]
-                maximum = field.metadata["max_selectable_choices"]
-                if not isinstance(response, list):
-                    raise serializers.ValidationError(
-                        {
-                            "data": {field.slug: "The answer should be a list."},
-                        }
-                    )
-                if len(response) < minimum or len(response) > maximum:
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: f"The number of answers should be more than {minimum} and less than {maximum}."
-                            },
-                        }
-                    )
-                for e in response:
-                    if str(e) not in field.metadata["choices"].keys():
-                        raise serializers.ValidationError(
-                            {
-                                "data": {field.slug: f"{e} is not a valid choice."},
-                            }
-                        )
-            case Field.TYPES.NUM_INPUT:
-                if not isinstance(response, (int, float)):
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: "The answer should be a number(float or int)."
-                            },
-                        }
-                    )
-                number_max_value = field.metadata["number_max_value"]
-                if response > number_max_value:
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: f"The answer should less than {number_max_value}."
-                            },
-                        }
-                    )
-                number_min_value = field.metadata["number_min_value"]
-                if response < number_min_value:
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: f"The answer should greater than {number_min_value}."
-                            },
-                        }
-                    )
-            case Field.TYPES.LONG_TXT_INPUT:
-                if not isinstance(response, str):
-                    raise serializers.ValidationError(
-                        {
-                            "data": {field.slug: "The answer should be a string."},
-                        }
-                    )
-                answer_max_length = field.metadata["answer_max_length"]
-                if len(response) > answer_max_length:
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: f"The answer should less than {answer_max_length} char."
-                            },
-                        }
-                    )
-                answer_min_length = field.metadata["answer_min_length"]
-                if len(response) < answer_min_length:
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: f"The answer should more than {answer_min_length} char."
-                            },
-                        }
-                    )
-            case Field.TYPES.SHORT_TXT_INPUT:
-                if not isinstance(response, str):
-                    raise serializers.ValidationError(
-                        {
-                            "data": {field.slug: "The answer should be a string."},
-                        }
-                    )
-                answer_max_length = field.metadata["answer_max_length"]
-                if len(response) > answer_max_length:
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: f"The answer should less than {answer_max_length} char."
-                            },
-                        }
-                    )
-                answer_min_length = field.metadata["answer_min_length"]
-                if len(response) < answer_min_length:
-                    raise serializers.ValidationError(
-                        {
-                            "data": {
-                                field.slug: f"The answer should more than {answer_min_length} char."
-                            },
-                        }
-                    )
-                regex_value = field.metadata["regex_value"]
-                if not re.match(regex_value, response):
-                    raise serializers.ValidationError(
-                        {
-                            "data": {field.slug: field.error_message},
-                        }
-                    )
+
+class ResponseIngestionSerializer(serializers.ModelSerializer):
+    receipt = serializers.UUIDField(source="id")
+    status = serializers.CharField(source="get_status_display")
+
+    class Meta:
+        model = ResponseIngestion
+        fields = ["receipt", "pipeline", "status", "result", "created_at", "processed_at"]
 
 
 class ResponseUpdateSerializer(serializers.ModelSerializer):
@@ -344,18 +175,18 @@ class ResponseUpdateSerializer(serializers.ModelSerializer):
         ]
 
     def validate(self, attrs):
-        if self.context["request"].session.session_key is None:
-            self.context["request"].session.create()
         if "data" not in attrs:
             raise serializers.ValidationError({"data": "This field is required."})
         return super().validate(attrs)
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         pipeline: Pipeline = instance.pipeline
+        session_key = get_session_key(self.context["request"])
         if self.context["request"].user.is_authenticated:
             if (
                 instance.owner != self.context["request"].user
-                and instance.session_key != self.context["request"].session.session_key
+                and instance.session_key != session_key
             ):
                 error = serializers.ValidationError(
                     {
@@ -365,7 +196,7 @@ class ResponseUpdateSerializer(serializers.ModelSerializer):
                 error.status_code = 403
                 raise error
         else:
-            if instance.session_key != self.context["request"].session.session_key:
+            if instance.session_key != session_key:
                 error = serializers.ValidationError(
                     {
                         "permission-denied": "You can't change this response! because you are not owner."
@@ -380,32 +211,16 @@ class ResponseUpdateSerializer(serializers.ModelSerializer):
                     "update-error": "This pipeline set as an unchangeble pipeline and you can't change your response!"
                 }
             )
-        fields: QuerySet[Field] = instance.form.fields.all()
-        update_validated_data = validated_data.get("data", instance.data)
-        for field in fields:
-            if field.answer_required:
-                if field.slug not in update_validated_data.keys():
-                    raise serializers.ValidationError(
-                        {
-                            "data": {{field.slug}: "This field is required."},
-                        }
-                    )
-            resp = update_validated_data.get(field.slug, None)
-            if resp is not None:
-                ResponseWriteSerializer.field_validation(
-                    field=field,
-                    response=resp,
-                )
-
-        keys_to_keep = [id[0] for id in fields.values_list("slug")]
-        filtered_dict = {
-            k: update_validated_data[k]
-            for k in keys_to_keep
-            if k in update_validated_data
-        }
-        validated_data["data"] = filtered_dict
+        plan = get_validation_plan(instance.form)
+        validated_data["data"] = plan.clean(
+            validated_data.get("data", instance.data)
+        )
 
-        return super().update(instance, validated_data)
+        old_data = instance.data
+        instance = super().update(instance, validated_data)
+        replace_answers(instance)
+        record_response_change(instance, old_data)
+        return instance
 
 
 class ReadResponseSerializer(serializers.BaseSerializer):
@@ -428,10 +243,8 @@ class PipelineSubmissionSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
     def get_responses(self, obj: PipelineSubmission):
-        resp = {}
-
-        for id in obj.responses["responsed_forms"]:
-            response = Response.objects.get(pipeline__id=obj.pipeline.id, form__id=id)
-            resp[f"form-{id}"] = ReadResponseSerializer(instance=response).data
-
-        return resp
+        # prefetched by with_answered_responses
+        return {
+            f"form-{response.form_id}": ReadResponseSerializer(instance=response).data
+            for response in obj.answered_responses
+        }
@@ -1,9 +1,9 @@
-from asgiref.sync import async_to_sync
-from channels.layers import get_channel_layer
+from django.db import transaction
 from django.db.models.signals import ModelSignal, post_delete, post_save
 from django.dispatch import receiver
 
-from reports.utils import create_new_report
+from reports.broadcast import mark_report_dirty
+from reports.statistics import forget_response
 
 from .models import Response
 
@@ -15,38 +15,8 @@ def web_socket_report_when_save_response(
     created: bool,
     **kwargs,
 ):
-    channel_layer = get_channel_layer()
-    phone = instance.pipeline.owner.phone
-    if created:
-        async_to_sync(channel_layer.group_send)(
-            f"report_{phone}_{instance.pipeline.id}",
-            {
-                "type": "form_response",
-                "message": "A new response submitted",
-            },
-        )
-        async_to_sync(channel_layer.group_send)(
-            f"report_{phone}_{instance.pipeline.id}",
-            {
-                "type": "form_response",
-                "message": create_new_report(instance.pipeline),
-            },
-        )
-    else:
-        async_to_sync(channel_layer.group_send)(
-            f"report_{phone}_{instance.pipeline.id}",
-            {
-                "type": "form_response",
-                "message": "A response updated",
-            },
-        )
-        async_to_sync(channel_layer.group_send)(
-            f"report_{phone}_{instance.pipeline.id}",
-            {
-                "type": "form_response",
-                "message": create_new_report(instance.pipeline),
-            },
-        )
+    pipeline_id = instance.pipeline_id
+    transaction.on_commit(lambda: mark_report_dirty(pipeline_id))
 
 
 @receiver(signal=post_delete, sender=Response)
@@ -55,19 +25,6 @@ def web_socket_report_when_delete_response(
     instance: Response,
     **kwargs,
 ):
-    channel_layer = get_channel_layer()
-    phone = instance.pipeline.owner.phone
-    async_to_sync(channel_layer.group_send)(
-        f"report_{phone}_{instance.pipeline.id}",
-        {
-            "type": "form_response",
-            "message": "A response deleted",
-        },
-    )
-    async_to_sync(channel_layer.group_send)(
-        f"report_{phone}_{instance.pipeline.id}",
-        {
-            "type": "form_response",
-            "message": create_new_report(instance.pipeline),
-        },
-    )
+    forget_response(instance)
+    pipeline_id = instance.pipeline_id
+    transaction.on_commit(lambda: mark_report_dirty(pipeline_id))
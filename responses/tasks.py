@@ -0,0 +1,15 @@
+from celery import shared_task
+from celery.utils.log import get_task_logger
+from django.core.cache import cache
+
+from .ingestion import DRAIN_KEY, drain_ingestions
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def drain_response_ingestions():
+    # ingestions queued from now on schedule the next drain
+    cache.delete(DRAIN_KEY)
+    drained = drain_ingestions()
+    logger.info(f"{drained} response ingestions drained")
@@ -0,0 +1,185 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from forms.models import Form
+from forms.validation import get_validation_plan
+from testing import TEST_CACHES, create_pipeline, create_user, submit
+
+from .models import PipelineSubmission, Response
+from .utils import save_responses
+
+DATA = {"age": 30, "color": ["1"]}
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ResponseRetrieveApiTests(TestCase):
+    def setUp(self):
+        self.owner = create_user(1)
+        self.respondent = create_user(2)
+        self.client = APIClient()
+        self.client.force_authenticate(self.respondent)
+
+    def count_queries(self, number_of_forms: int) -> int:
+        pipeline = create_pipeline(self.owner, number_of_forms)
+        submission = submit(
+            pipeline, None, {"age": 1, "color": ["1"]}, owner=self.respondent
+        )
+        url = reverse(
+            "api:responses:retrieve-response",
+            kwargs={"pipeline_submission_id": submission.id},
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["responses"]), number_of_forms)
+        return len(context.captured_queries)
+
+    def test_answered_forms_do_not_change_queries(self):
+        self.assertEqual(self.count_queries(2), self.count_queries(20))
+
+
+# the transaction of save_responses is the outermost one, as in a request
+@override_settings(CACHES=TEST_CACHES)
+class SaveResponsesTests(TransactionTestCase):
+    def setUp(self):
+        self.pipeline = create_pipeline(create_user(1), 3)
+        self.forms = list(Form.objects.filter(id__in=self.pipeline.metadata["order"]))
+        for form in self.forms:
+            get_validation_plan(form)
+
+    def count_statements(self, form: Form) -> int:
+        with CaptureQueriesContext(connection) as context:
+            save_responses(self.pipeline, [(form, DATA)], None, "key")
+        return len(
+            [
+                query
+                for query in context.captured_queries
+                if query["sql"] not in ("BEGIN", "COMMIT")
+            ]
+        )
+
+    def test_first_answer_inserts_the_submission(self):
+        self.assertEqual(self.count_statements(self.forms[0]), 6)
+        submission = PipelineSubmission.objects.get()
+        self.assertEqual(submission.answered_count, 1)
+        self.assertEqual(submission.get_answered_mask(), 0b1)
+
+    def test_next_answer_takes_four_statements(self):
+        save_responses(self.pipeline, [(self.forms[0], DATA)], None, "key")
+        self.assertEqual(self.count_statements(self.forms[1]), 4)
+        self.assertEqual(PipelineSubmission.objects.get().get_answered_mask(), 0b11)
+
+    def test_repeated_answer_is_rejected_from_the_submission(self):
+        save_responses(self.pipeline, [(self.forms[0], DATA)], None, "key")
+        with self.assertRaises(ValidationError):
+            save_responses(self.pipeline, [(self.forms[0], DATA)], None, "key")
+        self.assertEqual(Response.objects.count(), 1)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        self.pipeline = create_pipeline(create_user(1), 2)
+        self.forms = self.pipeline.metadata["order"]
+        self.url = reverse("api:responses:add-response-to-form")
+
+    def post(self, client: APIClient, form_id: int, key: str = None):
+        headers = {"Idempotency-Key": key} if key else {}
+        return client.post(
+            self.url,
+            {"pipeline": self.pipeline.id, "form": form_id, "data": DATA},
+            format="json",
+            headers=headers,
+        )
+
+    def test_retry_of_a_respondent_is_replayed(self):
+        client = APIClient()
+        self.post(client, self.forms[0])
+
+        first = self.post(client, self.forms[1], key="key")
+        retry = self.post(client, self.forms[1], key="key")
+
+        self.assertEqual(retry.status_code, first.status_code)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Response.objects.count(), 2)
+
+    def test_other_respondent_with_the_same_key_and_body_is_not_replayed(self):
+        first, second = APIClient(), APIClient()
+        self.post(first, self.forms[0])
+        self.post(second, self.forms[0])
+
+        self.post(first, self.forms[1], key="key")
+        response = self.post(second, self.forms[1], key="key")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertEqual(Response.objects.count(), 4)
+
+    def test_respondent_without_identity_is_not_replayed(self):
+        self.post(APIClient(), self.forms[0], key="key")
+        response = self.post(APIClient(), self.forms[0], key="key")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertIn(settings.SESSION_COOKIE_NAME, response.cookies)
+        self.assertEqual(PipelineSubmission.objects.count(), 2)
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BatchApiTests(TestCase):
+    def setUp(self):
+        owner = create_user(1)
+        self.pipeline = create_pipeline(owner, 2)
+        self.forms = self.pipeline.metadata["order"]
+        self.url = reverse("api:responses:add-responses-to-pipeline")
+
+    def post(self, responses: list):
+        return APIClient().post(
+            self.url,
+            {"pipeline": self.pipeline.id, "responses": responses},
+            format="json",
+        )
+
+    def test_batch_answers_every_form(self):
+        response = self.post([{"form": id, "data": DATA} for id in self.forms])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["responses"]), 2)
+        self.assertTrue(PipelineSubmission.objects.get().is_completed)
+
+    def test_invalid_answer_rejects_the_whole_batch(self):
+        response = self.post(
+            [
+                {"form": self.forms[0], "data": DATA},
+                {"form": self.forms[1], "data": {"age": 500, "color": ["1"]}},
+            ]
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data["responses"]), [self.forms[1]])
+        self.assertIn("age", response.data["responses"][self.forms[1]]["data"])
+        self.assertFalse(Response.objects.exists())
+
+    def test_form_answered_twice_is_rejected(self):
+        response = self.post([{"form": self.forms[0], "data": DATA}] * 2)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(self.forms[0], response.data["responses"])
+        self.assertFalse(Response.objects.exists())
+
+    def test_form_of_another_pipeline_is_rejected(self):
+        other = create_pipeline(self.pipeline.owner, 1).metadata["order"][0]
+
+        response = self.post(
+            [{"form": self.forms[0], "data": DATA}, {"form": other, "data": DATA}]
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data["responses"]), [other])
+        self.assertFalse(Response.objects.exists())
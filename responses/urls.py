@@ -1,11 +1,23 @@
 from django.urls import path
 
-from .apis import AddResponseView, ResponseRetrieveApi, UpdateResponseView
+from .apis import (
+    AddResponsesView,
+    AddResponseView,
+    ResponseIngestionView,
+    ResponseRetrieveApi,
+    UpdateResponseView,
+)
 
 app_name = "responses"
 
 urlpatterns = [
     path("add", AddResponseView.as_view(), name="add-response-to-form"),
+    path("add-batch", AddResponsesView.as_view(), name="add-responses-to-pipeline"),
+    path(
+        "ingestions/<uuid:receipt>",
+        ResponseIngestionView.as_view(),
+        name="response-ingestion",
+    ),
     path(
         "update/<int:response_id>", UpdateResponseView.as_view(), name="update-response"
     ),
@@ -1,3 +1,17 @@
+from django.db import transaction
+from django.db.models import F, Prefetch, QuerySet
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+
+from forms.models import Form, Pipeline
+from forms.validation import get_validation_plan
+from reports.broadcast import mark_report_dirty
+from reports.statistics import record_submission
+
+from .models import Answer, PipelineSubmission, Response
+
+
 def get_client_ip(request):
     x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
     if x_forwarded_for:
@@ -5,3 +19,156 @@ def get_client_ip(request):
     else:
         ip = request.META.get("REMOTE_ADDR")
     return ip
+
+
+def with_answered_responses(submissions: QuerySet) -> QuerySet:
+    """
+    Prefetch the responses of submissions, in the order they were given, as
+    ``answered_responses``.
+    """
+    return submissions.prefetch_related(
+        Prefetch(
+            "response_set",
+            queryset=Response.objects.select_related("owner").order_by("id"),
+            to_attr="answered_responses",
+        )
+    )
+
+
+def get_respondent_lookup(user, session_key: str) -> dict:
+    if user is not None and user.is_authenticated:
+        return {"owner": user}
+    return {"session_key": session_key}
+
+
+def get_answered_error(submission: PipelineSubmission, form_ids) -> dict:
+    response_id = (
+        Response.objects.filter(pipeline_submission=submission, form_id__in=form_ids)
+        .values_list("id", flat=True)
+        .first()
+    )
+    error = {
+        "message": f"You responsed to this form befor, if you want to change your response, use url below",
+    }
+    # an answer of the same drain batch is not written yet
+    if response_id is not None:
+        error["url"] = reverse(
+            "api:responses:update-response", kwargs={"response_id": response_id}
+        )
+    return error
+
+
+def build_responses(
+    submission: PipelineSubmission,
+    answers: list[tuple[Form, dict]],
+    lookup: dict,
+    submitted_at=None,
+) -> list[Response]:
+    """
+    Check ``(form, data)`` answers against a locked submission and return the
+    unsaved responses. The progress of the submission is advanced only when
+    every answer passes.
+
+    Repeated answers are caught by the answered mask of the submission, and
+    forms of pipelines with ``hide_next_button`` must also be answered at
+    ``next_position``.
+    """
+    pipeline: Pipeline = submission.pipeline
+    if submission.answered_count:
+        submitted_at = submitted_at or timezone.now()
+        duration = (submitted_at - submission.created_at).total_seconds() / 60
+        if pipeline.questions_responding_duration < duration:
+            raise serializers.ValidationError({"message": "Response time has expired."})
+
+    order = pipeline.metadata["order"]
+    mask = submission.get_answered_mask()
+    next_position = submission.next_position
+    responses = []
+    for form, data in answers:
+        position = order.index(form.id)
+        if mask & (1 << position):
+            raise serializers.ValidationError(get_answered_error(submission, [form.id]))
+        if pipeline.hide_next_button:
+            if position > next_position:
+                raise serializers.ValidationError(
+                    f"You should first answer to previous form with id: {order[position - 1]}"
+                )
+            next_position += 1
+        mask |= 1 << position
+        responses.append(
+            Response(
+                pipeline=pipeline,
+                form=form,
+                pipeline_submission=submission,
+                data=data,
+                **lookup,
+            )
+        )
+
+    submission.answered_count += len(responses)
+    submission.set_answered_mask(mask)
+    submission.next_position = next_position
+    submission.is_completed = submission.answered_count >= len(order)
+    return responses
+
+
+def build_answers(responses: list[Response]) -> list[Answer]:
+    """
+    Return the unsaved typed answers of saved responses.
+    """
+    answers = []
+    for response in responses:
+        plan = get_validation_plan(response.form)
+        for field_id, values in plan.typed_answers(response.data):
+            answers.append(Answer(response=response, field_id=field_id, **values))
+    return answers
+
+
+def replace_answers(response: Response) -> None:
+    Answer.objects.filter(response=response).delete()
+    Answer.objects.bulk_create(build_answers([response]))
+
+
+def save_responses(
+    pipeline: Pipeline, answers: list[tuple[Form, dict]], user, session_key: str
+) -> list[Response]:
+    """
+    Add the ``(form, data)`` answers of a respondent to their submission of a
+    pipeline in one transaction.
+
+    The submission is locked, so concurrent submits of one respondent run one
+    after the other. Apart from completing the statistics, an answer to an
+    existing submission takes four statements: lock it, insert the responses
+    and their typed answers and update it. The first answer of a respondent
+    takes two more, to insert the submission, ignoring one inserted
+    concurrently, and lock it.
+    """
+    lookup = get_respondent_lookup(user, session_key)
+    submissions = PipelineSubmission.objects.select_for_update().filter(
+        pipeline=pipeline, **lookup
+    )
+
+    with transaction.atomic():
+        submission = submissions.first()
+        if submission is None:
+            PipelineSubmission.objects.bulk_create(
+                [PipelineSubmission(pipeline=pipeline, **lookup)],
+                ignore_conflicts=True,
+            )
+            submission = submissions.get()
+        submission.pipeline = pipeline
+        responses = build_responses(submission, answers, lookup)
+        Response.objects.bulk_create(responses)
+        Answer.objects.bulk_create(build_answers(responses))
+        PipelineSubmission.objects.filter(pk=submission.pk).update(
+            answered_count=F("answered_count") + len(responses),
+            answered_mask=submission.answered_mask,
+            next_position=submission.next_position,
+            is_completed=submission.is_completed,
+            updated_at=timezone.now(),
+        )
+        if submission.is_completed:
+            record_submission(submission)
+        # bulk_create sends no post_save
+        transaction.on_commit(lambda: mark_report_dirty(pipeline.id))
+    return responses
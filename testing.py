@@ -0,0 +1,100 @@
+"""
+Fixtures shared by the tests of the apps.
+"""
+
+from accounts.models import User
+from forms.models import Field, Form, Pipeline
+from responses.models import Answer, PipelineSubmission, Response
+from responses.utils import build_answers
+
+TEST_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+def create_user(number: int) -> User:
+    return User.objects.create_user(
+        phone=f"0912000{number:04}",
+        email=f"user{number}@example.com",
+        password="12345678",
+        first_name="first",
+        last_name="last",
+    )
+
+
+def create_pipeline(owner: User, number_of_forms: int) -> Pipeline:
+    """
+    Create a pipeline of forms that each have a number and a choice field.
+    """
+    forms = []
+    for index in range(number_of_forms):
+        age = Field.objects.create(
+            metadata={"number_min_value": 0, "number_max_value": 100},
+            title="age",
+            slug="age",
+            description_text="age",
+            type=Field.TYPES.NUM_INPUT,
+            answer_required=True,
+            error_message="bad age",
+            owner=owner,
+        )
+        color = Field.objects.create(
+            metadata={
+                "choices": {"1": "red", "10": "blue"},
+                "min_selectable_choices": 1,
+                "max_selectable_choices": 2,
+            },
+            title="color",
+            slug="color",
+            description_text="color",
+            type=Field.TYPES.CHOISES_INPUT,
+            answer_required=True,
+            error_message="bad color",
+            owner=owner,
+        )
+        form = Form.objects.create(
+            metadata={"order": [age.id, color.id]}, title=f"form {index}", owner=owner
+        )
+        form.fields.set([age, color])
+        forms.append(form)
+    return Pipeline.objects.create(
+        metadata={"order": [form.id for form in forms]},
+        title="pipeline",
+        slug="pipeline",
+        description_text="pipeline",
+        questions_responding_duration=60,
+        hide_previous_button=False,
+        hide_next_button=False,
+        is_private=False,
+        owner=owner,
+    )
+
+
+def submit(
+    pipeline: Pipeline, session_key: str | None, data: dict, owner: User = None
+) -> PipelineSubmission:
+    """
+    Answer every form of a pipeline with ``data``, without touching the
+    statistics.
+    """
+    forms = list(Form.objects.filter(id__in=pipeline.metadata["order"]))
+    submission = PipelineSubmission(
+        pipeline=pipeline,
+        owner=owner,
+        session_key=session_key,
+        answered_count=len(forms),
+        is_completed=True,
+    )
+    submission.set_answered_mask((1 << len(forms)) - 1)
+    submission.save()
+    responses = [
+        Response.objects.create(
+            pipeline=pipeline,
+            form=form,
+            pipeline_submission=submission,
+            owner=owner,
+            session_key=session_key,
+            data=data,
+        )
+        for form in forms
+    ]
+    Answer.objects.bulk_create(build_answers(responses))
+    return submission